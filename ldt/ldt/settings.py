@@ -12,9 +12,39 @@ DEBUG = os.getenv("DJANGO_DEBUG", "true").lower() in ["true", "1", "t", "y"]
 ALLOWED_HOSTS = os.getenv("DJANGO_ALLOWED_HOSTS", "*").split()
 ALLOW_REVERSE = os.environ.get("DJANGO_ALLOW_REVERSE", "").lower() in ["", "true", "yes", "1", "y",
                                                                        ]
+ORDER_REPORT_WORKER = os.getenv("DJANGO_REPORT_WORKER", "thread")
+ORDER_REPORT_CACHE_MAX_SIZE = int(os.getenv("DJANGO_REPORT_CACHE_MAX_SIZE", 200 * 1024 * 1024))
+ORDER_REPORT_STALE_TIMEOUT = int(os.getenv("DJANGO_REPORT_STALE_TIMEOUT", 600))
+USER_AVATAR_WORKER = os.getenv("DJANGO_AVATAR_WORKER", "thread")
+
+CACHES = {
+    # sessions and signed in users; point it at a cache shared by all processes when there are several,
+    # otherwise a logout or a changed password stays unseen by the other processes
+    "default": {
+        "BACKEND": os.getenv("DJANGO_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_CACHE_LOCATION", ""),
+    },
+    # rendered board columns and order cards; use FileBasedCache when several processes serve the board
+    "board": {
+        "BACKEND": os.getenv("DJANGO_BOARD_CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("DJANGO_BOARD_CACHE_LOCATION", "order-board"),
+        "TIMEOUT": 300,
+        "OPTIONS": {
+            "MAX_ENTRIES": 20000,
+        },
+    },
+}
+
+ORDER_LIVE_BACKEND = os.getenv("DJANGO_LIVE_BACKEND", "order.live.LocalBroadcast")
+ORDER_LIVE_REDIS_URL = os.getenv("DJANGO_LIVE_REDIS_URL", "redis://localhost:6379/0")
+ORDER_LIVE_REDIS_CHANNEL = "order-live"
+
 AUTHENTICATION_BACKENDS = (
     "users.backends.EmailAuthBackend",
 )
+USER_CACHE_TIMEOUT = 5 * 60
+
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
 
 INSTALLED_APPS = [
     "django.contrib.admin",
@@ -31,6 +61,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "ldt.static.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -45,8 +76,17 @@ TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
         "DIRS": [BASE_DIR / "templates"],
-        "APP_DIRS": True,
         "OPTIONS": {
+            # templates are parsed once per process; runserver resets the cache when a template changes
+            "loaders": [
+                (
+                    "django.template.loaders.cached.Loader",
+                    [
+                        "django.template.loaders.filesystem.Loader",
+                        "django.template.loaders.app_directories.Loader",
+                    ],
+                ),
+            ],
             "context_processors": [
                 "django.template.context_processors.debug",
                 "django.template.context_processors.request",
@@ -97,6 +137,18 @@ STATICFILES_DIRS = [BASE_DIR / "static_dev"]
 
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    # content-hashed names plus .gz/.br copies, built by collectstatic
+    "staticfiles": {
+        "BACKEND": "ldt.static.CompressedManifestStaticFilesStorage",
+    },
+}
+
+STATIC_SERVE = os.getenv("DJANGO_SERVE_STATIC", "false").lower() in ["true", "1", "t", "y"]
+
 MEDIA_ROOT = BASE_DIR / "media"
 
 MEDIA_URL = "/media/"
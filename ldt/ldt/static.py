@@ -0,0 +1,156 @@
+import gzip
+import mimetypes
+import os
+from pathlib import Path
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_EXTENSIONS = {".css", ".js", ".map", ".svg", ".json", ".txt", ".html", ".xml"}
+COMPRESS_MIN_SIZE = 1024
+# hashed names change with the content, so browsers and proxies may keep them for good
+STATIC_IMMUTABLE_CACHE = "public, max-age=31536000, immutable"
+STATIC_CACHE = "public, max-age=600"
+
+ENCODINGS = {"br": ".br", "gzip": ".gz"}
+
+
+def compress(path):
+    # writes .gz and, with the brotli package, .br next to the file; a variant that saves too little is removed
+    data = path.read_bytes()
+    variants = {".gz": gzip.compress(data, 9, mtime=0)}
+    if brotli is not None:
+        variants[".br"] = brotli.compress(data, quality=11)
+    for suffix, compressed in variants.items():
+        target = path.with_name(path.name + suffix)
+        if len(data) >= COMPRESS_MIN_SIZE and len(compressed) < len(data) * 0.95:
+            target.write_bytes(compressed)
+        else:
+            target.unlink(missing_ok=True)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Collects the files under content-hashed names and precompresses the text ones,
+    so that neither the web server nor the application compresses them per request.
+    """
+
+    keep_intermediate_files = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            path = Path(self.path(name))
+            if path.suffix in COMPRESSED_EXTENSIONS and path.is_file():
+                compress(path)
+
+
+def accepted_encodings(request):
+    accepted = set()
+    for value in request.headers.get("Accept-Encoding", "").split(","):
+        coding, _, quality = value.replace(" ", "").partition(";q=")
+        if quality not in ("0", "0.0", "0.00", "0.000"):
+            accepted.add(coding.lower())
+    return accepted
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = path.stat()
+        self.path = path
+        self.last_modified = int(stat.st_mtime)
+        self.content_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        self.cache_control = STATIC_IMMUTABLE_CACHE if immutable else STATIC_CACHE
+        self.variants = {
+            encoding: variant
+            for encoding, suffix in ENCODINGS.items()
+            if (variant := path.with_name(path.name + suffix)).is_file()
+        }
+
+    def response(self, request, in_memory=False):
+        response = get_conditional_response(request, last_modified=self.last_modified)
+        if response is None:
+            accepted = accepted_encodings(request)
+            encoding, path = next(
+                ((encoding, path) for encoding, path in self.variants.items() if encoding in accepted),
+                (None, self.path),
+            )
+            if in_memory:
+                # ASGI servers have no sendfile(), and a streamed file would be buffered whole anyway
+                response = HttpResponse(path.read_bytes(), content_type=self.content_type)
+            else:
+                # behind a WSGI server FileResponse goes through wsgi.file_wrapper, which gunicorn and uWSGI
+                # hand to sendfile(), so the file is copied by the kernel rather than read into Python
+                response = FileResponse(path.open("rb"), content_type=self.content_type)
+            if encoding:
+                response.headers["Content-Encoding"] = encoding
+            response.headers["Last-Modified"] = http_date(self.last_modified)
+        if self.variants:
+            patch_vary_headers(response, ["Accept-Encoding"])
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Serves STATIC_ROOT with far-future caching and the precompressed variants for deployments
+    without a web server in front of the application. Enabled by DJANGO_SERVE_STATIC; the files are
+    indexed once at startup, so collectstatic has to run before the processes start.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        # under ASGI the chain stays async, otherwise every request would be handed to a thread
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.prefix = settings.STATIC_URL
+        self.files = self.index(Path(settings.STATIC_ROOT))
+
+    @staticmethod
+    def index(root):
+        hashed = set(getattr(staticfiles_storage, "hashed_files", {}).values())
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = Path(directory, name)
+                if path.suffix in (".gz", ".br"):
+                    continue
+                url = path.relative_to(root).as_posix()
+                files[url] = StaticFile(path, url in hashed)
+        return files
+
+    def find(self, request):
+        if request.method in ("GET", "HEAD") and request.path.startswith(self.prefix):
+            return self.files.get(request.path.removeprefix(self.prefix))
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        static_file = self.find(request)
+        if static_file is not None:
+            return static_file.response(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        static_file = self.find(request)
+        if static_file is not None:
+            return await sync_to_async(static_file.response, thread_sensitive=False)(request, in_memory=True)
+        return await self.get_response(request)
@@ -0,0 +1,5 @@
+# the manifest only exists after collectstatic, so tests serve the static files by their plain names
+STATIC_STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"},
+}
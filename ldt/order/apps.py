@@ -1,7 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class OrdersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "order"
     verbose_name = "заказы"
+
+    def ready(self):
+        from order import signals  # noqa: F401
+        from order.reports import OrderReport
+        from order.search import order_search
+
+        OrderReport.setup()
+        post_migrate.connect(order_search.restore, sender=self)
@@ -0,0 +1,34 @@
+import hashlib
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+
+def page_etag(request, *shown):
+    # the header depends on the user, the forms embed a token derived from the CSRF cookie
+    user = request.user
+    shown = (user.pk, user.is_staff, user.is_superuser, request.COOKIES.get(settings.CSRF_COOKIE_NAME), *shown)
+    return hashlib.md5(repr(shown).encode()).hexdigest()
+
+
+def not_modified(request, etag, last_modified=None):
+    # pending messages are shown once by the rendered page, a cached copy would lose them
+    if len(get_messages(request)):
+        return None
+    response = get_conditional_response(
+        request,
+        etag=quote_etag(etag),
+        last_modified=int(last_modified.timestamp()) if last_modified else None,
+    )
+    return response and set_validators(response, etag)
+
+
+def set_validators(response, etag, last_modified=None):
+    response.headers["ETag"] = quote_etag(etag)
+    if last_modified:
+        response.headers["Last-Modified"] = http_date(last_modified.timestamp())
+    # browsers keep the page but ask every time whether it is still current
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
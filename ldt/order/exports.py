@@ -0,0 +1,129 @@
+import csv
+import tempfile
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.http import FileResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.http import content_disposition_header
+
+try:
+    from openpyxl import Workbook
+except ImportError:
+    Workbook = None
+
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FILE_CHUNK_SIZE = 64 * 1024
+EXPORT_COLUMNS = (
+    ("id", "№"),
+    ("name", "Название"),
+    ("client", "Клиент"),
+    ("contact_number", "Контактный номер"),
+    ("address", "Адрес"),
+    ("employee__email", "Исполнитель"),
+    ("creation_time", "Дата создания"),
+    ("delivery_date", "Дата доставки"),
+    ("payment_method", "Способ оплаты"),
+    ("price", "Цена"),
+    ("status", "Выполнен"),
+)
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def xlsx_available():
+    return Workbook is not None
+
+
+def format_datetime(value):
+    return timezone.localtime(value).strftime("%d.%m.%Y %H:%M") if value else ""
+
+
+def export_values(orders):
+    return orders.order_by("creation_time", "id").values_list(*(field for field, _ in EXPORT_COLUMNS))
+
+
+def export_row(values):
+    (pk, name, client, contact_number, address, employee, creation_time, delivery_date,
+     payment_method, price, status) = values
+    return [pk, name, client, contact_number, address, employee or "", format_datetime(creation_time),
+            format_datetime(delivery_date), payment_method, price, "да" if status else "нет"]
+
+
+def iter_export_rows(orders):
+    yield [title for _, title in EXPORT_COLUMNS]
+    for values in export_values(orders).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield export_row(values)
+
+
+async def aiter_export_rows(orders):
+    yield [title for _, title in EXPORT_COLUMNS]
+    # aiterator() would run a values_list() query on the event loop, so the chunks of the
+    # sync iterator are fetched one by one in the thread that holds the connection
+    rows = export_values(orders).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    next_chunk = sync_to_async(lambda: list(islice(rows, EXPORT_CHUNK_SIZE)))
+    while chunk := await next_chunk():
+        for values in chunk:
+            yield export_row(values)
+
+
+async def aiter_file(file):
+    try:
+        while chunk := await sync_to_async(file.read, thread_sensitive=False)(EXPORT_FILE_CHUNK_SIZE):
+            yield chunk
+    finally:
+        await sync_to_async(file.close, thread_sensitive=False)()
+
+
+# under ASGI a streamed response has to be fed by an async iterator,
+# Django reads a sync one into memory whole before sending the first byte
+
+def csv_response(orders, filename, asynchronous=False):
+    writer = csv.writer(Echo(), delimiter=";")
+
+    def stream():
+        # BOM so that Excel opens the file as UTF-8
+        yield "\ufeff"
+        for row in iter_export_rows(orders):
+            yield writer.writerow(row)
+
+    async def astream():
+        yield "\ufeff"
+        async for row in aiter_export_rows(orders):
+            yield writer.writerow(row)
+
+    response = StreamingHttpResponse(astream() if asynchronous else stream(), content_type="text/csv; charset=utf-8")
+    response["Content-Disposition"] = f'attachment; filename="{filename}.csv"'
+    return response
+
+
+def file_response(file, filename, content_type=None, asynchronous=False):
+    if not asynchronous:
+        return FileResponse(file, as_attachment=True, filename=filename, content_type=content_type)
+
+    size = file.seek(0, 2)
+    file.seek(0)
+    response = StreamingHttpResponse(aiter_file(file), content_type=content_type or "application/octet-stream")
+    response["Content-Length"] = size
+    response["Content-Disposition"] = content_disposition_header(True, filename)
+    return response
+
+
+def xlsx_response(orders, filename, asynchronous=False):
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Заказы")
+    for row in iter_export_rows(orders):
+        sheet.append(row)
+
+    output = tempfile.TemporaryFile()
+    workbook.save(output)
+    output.seek(0)
+    return file_response(
+        output,
+        f"{filename}.xlsx",
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        asynchronous,
+    )
@@ -1,6 +1,7 @@
 from django import forms
 
 from order.models import Order
+from order.reports import get_custom_period, get_report_period
 
 from users.models import User
 
@@ -58,3 +59,95 @@ class CreateOrderForm(forms.ModelForm):
             field.field.widget.attrs["id"] = field.name
             field.field.widget.attrs["name"] = field.name
             field.field.widget.attrs["class"] = "form-control"
+
+
+class ExportForm(forms.Form):
+    RANGE_CHOICES = (
+        ("day", "За день"),
+        ("month", "За месяц"),
+        ("custom", "За период"),
+    )
+    FORMAT_CHOICES = (
+        ("pdf", "PDF"),
+        ("csv", "CSV"),
+        ("xlsx", "XLSX"),
+    )
+
+    range = forms.ChoiceField(choices=RANGE_CHOICES, initial="day")
+    format = forms.ChoiceField(choices=FORMAT_CHOICES, initial="pdf")
+    date_from = forms.DateField(required=False)
+    date_to = forms.DateField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("range") == "custom":
+            date_from = cleaned_data.get("date_from")
+            date_to = cleaned_data.get("date_to")
+            if not date_from or not date_to:
+                raise forms.ValidationError("Укажите начало и конец периода")
+            if date_from > date_to:
+                raise forms.ValidationError("Начало периода не может быть позже конца")
+        return cleaned_data
+
+    def get_period(self):
+        if self.cleaned_data["range"] == "custom":
+            return get_custom_period(self.cleaned_data["date_from"], self.cleaned_data["date_to"])
+        return get_report_period(self.cleaned_data["range"])
+
+
+class ImportOrdersForm(forms.Form):
+    file = forms.FileField()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["file"].widget.attrs.update({"class": "form-control", "accept": ".csv,.json"})
+
+    def clean_file(self):
+        file = self.cleaned_data["file"]
+        if self.get_format(file) not in ("csv", "json"):
+            raise forms.ValidationError("Загрузите файл в формате CSV или JSON")
+        return file
+
+    @staticmethod
+    def get_format(file):
+        return file.name.rsplit(".", 1)[-1].lower()
+
+
+class OrderIdsField(forms.Field):
+    widget = forms.MultipleHiddenInput
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            return [int(pk) for pk in value]
+        except (TypeError, ValueError):
+            raise forms.ValidationError("Неверный список заказов")
+
+
+class BulkActionForm(forms.Form):
+    ACTION_CHOICES = (
+        ("assign", "Назначить"),
+        ("complete", "Завершить"),
+        ("cancel", "Вернуть в работу"),
+        ("delete", "Удалить"),
+    )
+
+    ids = OrderIdsField()
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    employee = forms.ModelChoiceField(queryset=User.objects.filter(is_staff=False), required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if cleaned_data.get("action") == "assign" and not cleaned_data.get("employee"):
+            raise forms.ValidationError("Выберите исполнителя")
+        return cleaned_data
+
+    def apply(self):
+        ids = self.cleaned_data["ids"]
+        action = self.cleaned_data["action"]
+        if action == "assign":
+            return len(Order.objects.bulk_assign(ids, self.cleaned_data["employee"]))
+        if action == "delete":
+            return Order.objects.bulk_delete(ids)
+        return len(Order.objects.bulk_set_status(ids, action == "complete"))
@@ -0,0 +1,163 @@
+import hashlib
+import time
+
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.template import Context
+from django.template.loader import get_template, render_to_string
+from django.utils.connection import ConnectionProxy
+from django.utils.safestring import mark_safe
+
+from order.pagination import akeyset_page, keyset_page
+
+BOARD_CACHE = "board"
+BOARD_VERSION_KEY = "board:version"
+CARD_TIMEOUT = 24 * 60 * 60
+CARD_TEMPLATE = "includes/order_card.html"
+EMPLOYEE_CARD_TEMPLATE = "includes/order_card_for_employee.html"
+CARDS_TEMPLATE = "includes/order_cards.html"
+
+board_cache = ConnectionProxy(caches, BOARD_CACHE)
+
+
+def count(kind, hits, misses):
+    for outcome, delta in (("hits", hits), ("misses", misses)):
+        key = f"board:stats:{kind}:{outcome}"
+        if delta and not board_cache.add(key, delta, None):
+            try:
+                board_cache.incr(key, delta)
+            except ValueError:
+                pass
+
+
+async def acount(kind, hits, misses):
+    for outcome, delta in (("hits", hits), ("misses", misses)):
+        key = f"board:stats:{kind}:{outcome}"
+        if delta and not await board_cache.aadd(key, delta, None):
+            try:
+                await board_cache.aincr(key, delta)
+            except ValueError:
+                pass
+
+
+def cache_stats():
+    keys = [f"board:stats:{kind}:{outcome}" for kind in ("column", "card") for outcome in ("hits", "misses")]
+    values = board_cache.get_many(keys)
+    return {
+        kind: {outcome: values.get(f"board:stats:{kind}:{outcome}", 0) for outcome in ("hits", "misses")}
+        for kind in ("column", "card")
+    }
+
+
+def card_marker(order):
+    # everything a card shows, so a changed order never hits a stale card
+    shown = (order.status, order.employee_id, order.creation_time, order.delivery_date, order.name,
+             order.description_preview)
+    return hashlib.md5(repr(shown).encode()).hexdigest()
+
+
+def card_renderer(template_name):
+    # looks the template up once and renders every card into the same context
+    template = get_template(template_name).template
+    context = Context(autoescape=template.engine.autoescape)
+
+    def render(order):
+        with context.push(order=order):
+            return template.render(context)
+
+    return render
+
+
+def render_cards(orders, template_name=CARD_TEMPLATE):
+    keys = {order.pk: f"board:card:{template_name}:{order.pk}:{card_marker(order)}" for order in orders}
+    cached = board_cache.get_many(keys.values())
+
+    cards = []
+    missing = {}
+    render = None
+    for order in orders:
+        card = cached.get(keys[order.pk])
+        if card is None:
+            render = render or card_renderer(template_name)
+            card = missing[keys[order.pk]] = render(order)
+        cards.append(mark_safe(card))
+
+    if missing:
+        board_cache.set_many(missing, CARD_TIMEOUT)
+    count("card", len(orders) - len(missing), len(missing))
+    return cards
+
+
+def render_column(orders, show_empty=True):
+    return render_to_string(CARDS_TEMPLATE, {"cards": render_cards(orders), "show_empty": show_empty})
+
+
+# cache lookups and rendering for the async views, run off the event loop
+arender_cards = sync_to_async(render_cards)
+arender_column = sync_to_async(render_column)
+
+
+def board_version():
+    version = board_cache.get(BOARD_VERSION_KEY)
+    if version is None:
+        version = invalidate_board()
+    return version
+
+
+async def aboard_version():
+    version = await board_cache.aget(BOARD_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        await board_cache.aset(BOARD_VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_board():
+    # a fresh version instead of a counter, so an evicted version key never brings back old columns
+    version = time.time_ns()
+    board_cache.set(BOARD_VERSION_KEY, version, None)
+    return version
+
+
+def column_key(column):
+    return f"board:column:{column}:{board_version()}"
+
+
+async def acolumn_key(column):
+    return f"board:column:{column}:{await aboard_version()}"
+
+
+def get_column(key):
+    fragment = board_cache.get(key)
+    count("column", int(fragment is not None), int(fragment is None))
+    return fragment
+
+
+async def aget_column(key):
+    fragment = await board_cache.aget(key)
+    await acount("column", int(fragment is not None), int(fragment is None))
+    return fragment
+
+
+def set_column(key, orders, next_cursor):
+    fragment = {"html": render_column(orders), "next": next_cursor}
+    board_cache.set(key, fragment)
+    return fragment
+
+
+async def aset_column(key, orders, next_cursor):
+    fragment = {"html": await arender_column(orders), "next": next_cursor}
+    await board_cache.aset(key, fragment)
+    return fragment
+
+
+# the key is taken before the orders are read: an invalidation in between leaves the
+# fragment under the outdated version instead of the current one
+def column_fragment(column, queryset):
+    key = column_key(column)
+    return get_column(key) or set_column(key, *keyset_page(queryset))
+
+
+async def acolumn_fragment(column, queryset):
+    key = await acolumn_key(column)
+    return await aget_column(key) or await aset_column(key, *await akeyset_page(queryset))
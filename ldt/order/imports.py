@@ -0,0 +1,151 @@
+import csv
+import io
+import json
+from collections import Counter
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+
+from order.fragments import invalidate_board
+from order.live import publish_reload
+from order.models import Order, OrderCounter, ReportJob
+from order.phones import normalize_phone_numbers
+from users.models import User
+
+IMPORT_CHUNK_SIZE = 500
+IMPORT_FIELDS = (
+    "name",
+    "client",
+    "contact_number",
+    "address",
+    "payment_method",
+    "price",
+    "delivery_date",
+    "description",
+    "employee",
+    "status",
+)
+
+
+class ImportResult:
+    def __init__(self):
+        self.created = 0
+        self.errors = []
+
+    @property
+    def total(self):
+        return self.created + len(self.errors)
+
+    def add_error(self, line, error):
+        if isinstance(error, ValidationError):
+            if hasattr(error, "error_dict"):
+                messages = [f"{field}: {' '.join(errors)}" for field, errors in error.message_dict.items()]
+            else:
+                messages = error.messages
+        else:
+            messages = [str(error)]
+        self.errors.append((line, "; ".join(messages)))
+
+
+def read_csv_rows(file):
+    sample = file.read(4096)
+    file.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.DictReader(file, dialect=dialect)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_json_rows(file):
+    rows = json.load(file)
+    if not isinstance(rows, list):
+        raise ValueError("Ожидается JSON-массив заказов")
+    for line, row in enumerate(rows, start=1):
+        yield line, row
+
+
+def read_rows(file, file_format):
+    if isinstance(file, io.TextIOBase):
+        text = file
+    else:
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    if file_format == "json":
+        return read_json_rows(text)
+    return read_csv_rows(text)
+
+
+def build_orders(rows, result):
+    parsed_rows = []
+    for line, row in rows:
+        if isinstance(row, dict):
+            parsed_rows.append((line, {field: row.get(field) or "" for field in IMPORT_FIELDS}))
+        else:
+            result.add_error(line, "Строка должна быть объектом с полями заказа")
+    rows = parsed_rows
+
+    emails = {data["employee"] for _, data in rows if data["employee"]}
+    employees = dict(User.objects.filter(email__in=emails, is_staff=False).values_list("email", "id"))
+    phone_numbers = normalize_phone_numbers(data["contact_number"] for _, data in rows if data["contact_number"])
+
+    orders = []
+    for line, data in rows:
+        errors = {}
+        email = data.pop("employee")
+        if email and email not in employees:
+            errors["employee"] = ["Исполнитель с такой почтой не найден."]
+
+        contact_number = phone_numbers.get(data["contact_number"])
+        if isinstance(contact_number, ValidationError):
+            errors["contact_number"] = contact_number.messages
+        elif contact_number:
+            data["contact_number"] = contact_number
+
+        data["status"] = data["status"] or False
+        data["price"] = data["price"] or 0
+        data["delivery_date"] = data["delivery_date"] or None
+        data["description"] = data["description"] or None
+        order = Order(employee_id=employees.get(email), **data)
+        try:
+            order.clean_fields(exclude=["employee", *errors])
+        except ValidationError as error:
+            errors.update(error.message_dict)
+        else:
+            if order.delivery_date and timezone.is_naive(order.delivery_date):
+                order.delivery_date = timezone.make_aware(order.delivery_date)
+
+        if errors:
+            result.add_error(line, ValidationError(errors))
+        else:
+            orders.append(order)
+    return orders
+
+
+def save_orders(orders):
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+
+        # bulk_create does not send post_save, so counters and cached reports are updated here
+        buckets = Counter(order.status_bucket for order in orders)
+        for status_bucket, count in buckets.items():
+            OrderCounter.objects.shift(None, status_bucket, count)
+        ReportJob.objects.invalidate(orders[-1].creation_time)
+        transaction.on_commit(invalidate_board)
+        # one reload instead of an event per imported order
+        transaction.on_commit(publish_reload)
+
+
+def import_orders(rows, chunk_size=IMPORT_CHUNK_SIZE):
+    result = ImportResult()
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        orders = build_orders(chunk, result)
+        if orders:
+            save_orders(orders)
+            result.created += len(orders)
+    return result
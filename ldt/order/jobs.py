@@ -0,0 +1,26 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from order.models import ReportJob
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="report-worker")
+
+
+def run_pending_jobs(stale_timeout=None):
+    # a report left running by a restarted process would keep its period taken for good
+    stale_timeout = stale_timeout or timedelta(seconds=settings.ORDER_REPORT_STALE_TIMEOUT)
+    try:
+        requeued = ReportJob.objects.requeue_stale(stale_timeout)
+        while (job := ReportJob.objects.claim()) is not None:
+            job.run()
+    finally:
+        close_old_connections()
+    return requeued
+
+
+def schedule_pending_jobs():
+    if settings.ORDER_REPORT_WORKER == "thread":
+        transaction.on_commit(lambda: executor.submit(run_pending_jobs))
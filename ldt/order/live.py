@@ -0,0 +1,159 @@
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.functional import SimpleLazyObject
+from django.utils.module_loading import import_string
+
+from order.fragments import EMPLOYEE_CARD_TEMPLATE, render_cards
+from order.models import DONE, IN_PROGRESS, NOT_ASSIGNED, Order
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+LIVE_QUEUE_SIZE = 100
+LIVE_HEARTBEAT = 15
+
+BUCKET_COLUMNS = {
+    NOT_ASSIGNED: "not_assigned",
+    IN_PROGRESS: "assigned",
+    DONE: "done",
+}
+
+
+class LocalBroadcast:
+    # delivers events to the boards connected to this process
+
+    def __init__(self):
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def subscribe(self):
+        subscriber = (asyncio.get_running_loop(), asyncio.Queue(LIVE_QUEUE_SIZE))
+        with self.lock:
+            self.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def has_subscribers(self):
+        return bool(self.subscribers)
+
+    def publish(self, event):
+        with self.lock:
+            subscribers = list(self.subscribers)
+        # signals fire in worker threads, the queues belong to the server's event loop
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(self.deliver, queue, event)
+
+    @staticmethod
+    def deliver(queue, event):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # a client that fell behind starts over from a fresh board
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "reload"})
+
+
+class RedisBroadcast(LocalBroadcast):
+    # relays events through Redis pub/sub so that boards connected to any process receive them
+
+    def __init__(self):
+        if redis is None:
+            raise ImproperlyConfigured("RedisBroadcast requires the redis package")
+        super().__init__()
+        self.client = redis.Redis.from_url(settings.ORDER_LIVE_REDIS_URL)
+        self.channel = settings.ORDER_LIVE_REDIS_CHANNEL
+        self.listener = None
+
+    def subscribe(self):
+        with self.lock:
+            if self.listener is None:
+                self.listener = threading.Thread(target=self.listen, daemon=True)
+                self.listener.start()
+        return super().subscribe()
+
+    def listen(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel)
+        for message in pubsub.listen():
+            super().publish(json.loads(message["data"]))
+
+    def has_subscribers(self):
+        # boards may be connected to any other process
+        return True
+
+    def publish(self, event):
+        self.client.publish(self.channel, json.dumps(event))
+
+
+broadcast = SimpleLazyObject(lambda: import_string(settings.ORDER_LIVE_BACKEND)())
+
+
+def order_event(order):
+    employee_id, bucket = order.status_bucket
+    event = {
+        "type": "order",
+        "id": order.pk,
+        "employee_id": employee_id,
+        "column": BUCKET_COLUMNS[bucket],
+        "created": order.creation_time.timestamp(),
+        "html": render_cards([order])[0],
+    }
+    if employee_id is not None:
+        event["employee_html"] = render_cards([order], EMPLOYEE_CARD_TEMPLATE)[0]
+    return event
+
+
+def publish_orders(pks):
+    if not broadcast.has_subscribers():
+        return
+    for order in Order.objects.for_board().filter(pk__in=pks):
+        broadcast.publish(order_event(order))
+
+
+def publish_deleted(pks):
+    if not broadcast.has_subscribers():
+        return
+    for pk in pks:
+        broadcast.publish({"type": "delete", "id": pk})
+
+
+def publish_reload():
+    if broadcast.has_subscribers():
+        broadcast.publish({"type": "reload"})
+
+
+def event_for(event, user):
+    if event["type"] == "reload":
+        return event
+    if user.is_staff or user.is_superuser:
+        return {key: value for key, value in event.items() if key != "employee_html"}
+    if event["type"] == "order" and event["employee_id"] == user.pk:
+        return {**{key: value for key, value in event.items() if key != "html"}, "html": event["employee_html"]}
+    # couriers only learn that an order left their board, never what other orders contain
+    return {"type": "delete", "id": event["id"]}
+
+
+async def event_stream(user):
+    subscriber = broadcast.subscribe()
+    _, queue = subscriber
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), LIVE_HEARTBEAT)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+            yield f"data: {json.dumps(event_for(event, user))}\n\n"
+    finally:
+        broadcast.unsubscribe(subscriber)
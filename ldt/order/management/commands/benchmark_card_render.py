@@ -0,0 +1,61 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.template import Context, Engine
+from django.template.loader import render_to_string
+
+from order.fragments import CARD_TEMPLATE, card_renderer, render_cards
+from order.management.seeding import seed_couriers, seed_orders
+from order.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures how fast the board renders order cards, for each size in --sizes, inside a "
+        "rolled back transaction: a template lookup per card without and with the cached loader, "
+        "the card renderer that looks the template up once, and cards already in the board cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+        parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement, the best one counts.")
+
+    def handle(self, *args, **options):
+        # for comparison: loaders that find and parse the template again on every lookup
+        uncached = Engine(
+            dirs=settings.TEMPLATES[0]["DIRS"],
+            loaders=["django.template.loaders.filesystem.Loader", "django.template.loaders.app_directories.Loader"],
+        )
+        methods = {
+            "Поиск и разбор шаблона на каждую карточку": lambda orders: [
+                uncached.get_template(CARD_TEMPLATE).render(Context({"order": order})) for order in orders
+            ],
+            "Поиск шаблона в кэше загрузчика на каждую карточку": lambda orders: [
+                render_to_string(CARD_TEMPLATE, {"order": order}) for order in orders
+            ],
+            "Шаблон найден один раз": lambda orders: list(map(card_renderer(CARD_TEMPLATE), orders)),
+            "Карточки из кэша доски": render_cards,
+        }
+
+        with transaction.atomic():
+            seed_orders(max(options["sizes"]), seed_couriers(10))
+            orders = list(Order.objects.for_board().order_by("pk"))
+
+            for size in options["sizes"]:
+                self.stdout.write(f"{size} карточек:")
+                for label, render in methods.items():
+                    cards = orders[:size]
+                    if render is render_cards:
+                        render(cards)
+                    elapsed = min(self.measure(render, cards) for _ in range(options["repeat"]))
+                    self.stdout.write(f"  {label}: {elapsed * 1000:.1f} мс, {size / elapsed:.0f} карточек/с")
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def measure(render, cards):
+        started = time.perf_counter()
+        render(cards)
+        return time.perf_counter() - started
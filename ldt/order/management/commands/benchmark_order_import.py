@@ -0,0 +1,64 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.forms import CreateOrderForm
+from order.imports import import_orders
+from order.management.seeding import seed_couriers
+from order.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares creating orders one at a time the way OrderCreate does with the bulk "
+        "import, inside a rolled back transaction, and prints rows per second."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=5000)
+        parser.add_argument("--couriers", type=int, default=50)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            couriers = seed_couriers(options["couriers"])
+            rows = self.make_rows(options["rows"], couriers)
+
+            rate = self.measure(rows, self.create_one_by_one)
+            self.stdout.write(f"По одному заказу (форма и Order.objects.create): {rate:.0f} строк/с")
+
+            rate = self.measure(rows, lambda rows: import_orders(enumerate(rows, start=1)))
+            self.stdout.write(f"Пакетный импорт: {rate:.0f} строк/с")
+
+            transaction.set_rollback(True)
+
+    def make_rows(self, count, couriers, rng=None):
+        rng = rng or random.Random(0)
+        phone_numbers = [f"+7 912 {rng.randint(100, 999)}-{rng.randint(10, 99)}-{rng.randint(10, 99)}"
+                         for _ in range(200)]
+        return [
+            {
+                "name": f"Заказ {index}",
+                "client": "Клиент",
+                "contact_number": rng.choice(phone_numbers),
+                "address": "Москва",
+                "payment_method": "оплачено",
+                "price": str(rng.randint(100, 5000)),
+                "description": "Описание заказа",
+                "employee": rng.choice(couriers).email if rng.random() < 0.5 else "",
+            }
+            for index in range(count)
+        ]
+
+    def measure(self, rows, create):
+        started = time.perf_counter()
+        create(rows)
+        return len(rows) / (time.perf_counter() - started)
+
+    def create_one_by_one(self, rows):
+        for row in rows:
+            form = CreateOrderForm(row)
+            form.is_valid()
+            order = Order.objects.create(status=False, **form.cleaned_data)
+            order.save()
@@ -0,0 +1,81 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from order.management.seeding import seed_couriers, seed_orders
+from order.models import Order
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a large order table inside a rolled back transaction and prints "
+        "query plans and timings for the OrderManager queries without and with "
+        "the order indexes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=100_000)
+        parser.add_argument("--couriers", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+
+        with transaction.atomic():
+            couriers = seed_couriers(options["couriers"])
+            seed_orders(options["orders"], couriers)
+            self.analyze()
+            self.courier = couriers[0]
+
+            self.execute_index_sql(lambda index, editor: index.remove_sql(Order, editor))
+            self.analyze()
+            self.report("Без индексов")
+
+            self.execute_index_sql(lambda index, editor: index.create_sql(Order, editor))
+            self.analyze()
+            self.report("С индексами")
+
+            transaction.set_rollback(True)
+
+    def get_queries(self):
+        return {
+            "orders_without_employee": Order.objects.orders_without_employee(),
+            "orders_with_employee_false_status": Order.objects.orders_with_employee_false_status(),
+            "orders_with_status_true": Order.objects.orders_with_status_true(),
+            "orders_with_employee_false_status_for_employee":
+                Order.objects.orders_with_employee_false_status_for_employee(self.courier),
+            "orders_with_status_true_for_employee":
+                Order.objects.orders_with_status_true_for_employee(self.courier),
+            "orders_created_this_month": Order.objects.orders_created_this_month(),
+            "orders_created_today": Order.objects.orders_created_today(),
+        }
+
+    def report(self, title):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in self.get_queries().items():
+            page = queryset.order_by("-creation_time", "-id")[:30]
+            self.stdout.write(self.style.MIGRATE_LABEL(f"  {name}"))
+            self.stdout.write(f"    {page.explain()}".replace("\n", "\n    "))
+            self.stdout.write(f"    первая страница: {self.measure(lambda: list(page.all())):.2f} мс")
+            self.stdout.write(f"    count(): {self.measure(queryset.count):.2f} мс")
+
+    def measure(self, query):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def execute_index_sql(self, statement):
+        # SQLite refuses schema_editor() inside atomic(), so run the raw index DDL instead
+        editor = connection.schema_editor()
+        with connection.cursor() as cursor:
+            for index in Order._meta.indexes:
+                cursor.execute(str(statement(index, editor)))
+
+    def analyze(self):
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
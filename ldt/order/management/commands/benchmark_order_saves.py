@@ -0,0 +1,73 @@
+import random
+import time
+
+import phonenumbers
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from order.management.seeding import seed_couriers, seed_orders
+from order.models import Order
+from order.phones import parse_phone_number
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures order saves per second inside a rolled back transaction: status flips "
+        "like OrderComplete and new orders, with phone numbers parsed on every save versus "
+        "the cached normalization that skips unchanged numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--numbers", type=int, default=200, help="Distinct phone numbers in new orders.")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed_orders(options["orders"], seed_couriers(10))
+            orders = list(Order.objects.all())
+            rng = random.Random(0)
+            numbers = [f"+7912{rng.randint(1_000_000, 9_999_999)}" for _ in range(options["numbers"])]
+
+            rate = self.measure(orders, lambda order: self.flip_status(order, parse_each_time=True))
+            self.stdout.write(f"Смена статуса, разбор номера при каждом сохранении: {rate:.0f} сохранений/с")
+            rate = self.measure(orders, self.flip_status)
+            self.stdout.write(f"Смена статуса, номер не изменился: {rate:.0f} сохранений/с")
+
+            rate = self.measure(orders, lambda order: self.create(numbers, rng, parse_each_time=True))
+            self.stdout.write(f"Новые заказы без кэша: {rate:.0f} сохранений/с")
+            rate = self.measure(orders, lambda order: self.create(numbers, rng))
+            self.stdout.write(f"Новые заказы с кэшем: {rate:.0f} сохранений/с")
+
+            transaction.set_rollback(True)
+
+    def measure(self, orders, save):
+        parse_phone_number.cache_clear()
+        started = time.perf_counter()
+        for order in orders:
+            save(order)
+        return len(orders) / (time.perf_counter() - started)
+
+    def flip_status(self, order, parse_each_time=False):
+        if parse_each_time:
+            self.parse(order.contact_number)
+        order.status = not order.status
+        order.save()
+
+    def create(self, numbers, rng, parse_each_time=False):
+        contact_number = rng.choice(numbers)
+        if parse_each_time:
+            parse_phone_number.cache_clear()
+            self.parse(contact_number)
+        Order.objects.create(
+            status=False,
+            name="Заказ",
+            client="Клиент",
+            contact_number=contact_number,
+            payment_method="оплачено",
+            address="Москва",
+        )
+
+    def parse(self, contact_number):
+        # what Order.save did before: parse and format the number again on every save
+        parsed_number = phonenumbers.parse(contact_number, None)
+        phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
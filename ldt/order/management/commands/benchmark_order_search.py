@@ -0,0 +1,70 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from order.management.seeding import seed_couriers, seed_orders
+from order.models import Order
+from order.search import SEARCH_PAGE_SIZE, order_search
+
+SEARCH_FIELDS = ("name", "client", "address", "contact_number", "description")
+
+
+class Command(BaseCommand):
+    help = (
+        "Seeds a large order table inside a rolled back transaction and compares a page of "
+        "icontains search over the order fields with the full-text index."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--orders", type=int, default=1_000_000)
+        parser.add_argument("--couriers", type=int, default=50)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        self.repeat = options["repeat"]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            seed_orders(options["orders"], seed_couriers(options["couriers"]))
+            self.stdout.write(f"Заказы созданы вместе с индексом за {time.perf_counter() - started:.1f} с")
+            self.mark_orders(options["orders"])
+
+            for query in ("Заказ 1234", "описание", "Маргарита", "912 345"):
+                self.report(query)
+
+            transaction.set_rollback(True)
+
+    def mark_orders(self, count, rng=None):
+        # a rare word, so that the benchmark also covers a selective query
+        rng = rng or random.Random(0)
+        pks = rng.sample(list(Order.objects.values_list("pk", flat=True)), max(count // 1000, 1))
+        Order.objects.filter(pk__in=pks).update(name="Пицца Маргарита")
+
+    def report(self, query):
+        icontains = Q()
+        for term in query.split():
+            icontains &= Q(*(Q(**{f"{field}__icontains": term}) for field in SEARCH_FIELDS), _connector=Q.OR)
+        queryset = Order.objects.filter(icontains).order_by("-creation_time", "-id")
+        results = order_search.search(query, Order.objects.all())
+
+        self.stdout.write(self.style.MIGRATE_LABEL(f"  «{query}»: найдено {results.count()}"))
+        self.stdout.write(
+            f"    icontains: страница {self.measure(lambda: list(queryset[:SEARCH_PAGE_SIZE])):.2f} мс, "
+            f"count() {self.measure(queryset.count):.2f} мс"
+        )
+        self.stdout.write(
+            f"    полнотекстовый индекс: страница {self.measure(lambda: results[0:SEARCH_PAGE_SIZE]):.2f} мс, "
+            f"count() {self.measure(lambda: order_search.count(results.terms)):.2f} мс"
+        )
+
+    def measure(self, query):
+        timings = []
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            query()
+            timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
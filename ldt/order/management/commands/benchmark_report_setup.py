@@ -0,0 +1,51 @@
+import io
+import time
+
+from django.core.management.base import BaseCommand
+from reportlab.lib import colors
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import TableStyle
+
+from order.models import Order
+from order.reports import OrderReport
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures the per-export setup time of the PDF report: fonts and styles built "
+        "on every request versus the OrderReport setup done once at startup."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        repeat = options["repeat"]
+        orders = Order.objects.none()
+
+        per_request = self.measure(repeat, self.per_request_setup)
+        self.stdout.write(f"Шрифт и стили на каждый запрос: {per_request:.2f} мс")
+
+        once = self.measure(repeat, lambda: OrderReport(orders, "Отчет"))
+        self.stdout.write(f"OrderReport, настроенный при запуске: {once:.3f} мс")
+
+        build = self.measure(repeat, lambda: OrderReport(orders, "Отчет").build(io.BytesIO()))
+        self.stdout.write(f"Полное формирование пустого отчёта: {build:.2f} мс")
+
+    def measure(self, repeat, setup):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            setup()
+        return (time.perf_counter() - started) * 1000 / repeat
+
+    def per_request_setup(self):
+        pdfmetrics.registerFont(TTFont(OrderReport.font_name, OrderReport.font_path))
+        for name, size in (("Title", 18), ("Subtitle", 14)):
+            ParagraphStyle(name, fontName=OrderReport.font_name, fontSize=size, textColor=colors.black,
+                           alignment=1, spaceAfter=12)
+        TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), OrderReport.font_name),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
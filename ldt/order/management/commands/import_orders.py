@@ -0,0 +1,39 @@
+import time
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from order.imports import IMPORT_CHUNK_SIZE, IMPORT_FIELDS, import_orders, read_rows
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports orders from a CSV or JSON file. Columns: " + ", ".join(IMPORT_FIELDS) + ". "
+        "employee is the courier's email. Invalid rows are skipped and reported."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=("csv", "json"), help="Defaults to the file extension.")
+        parser.add_argument("--chunk-size", type=int, default=IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = Path(options["path"])
+        file_format = options["format"] or path.suffix.lstrip(".").lower()
+        if file_format not in ("csv", "json"):
+            raise CommandError("Укажите формат файла: --format csv или --format json")
+
+        started = time.perf_counter()
+        try:
+            with path.open("rb") as file:
+                result = import_orders(read_rows(file, file_format), options["chunk_size"])
+        except (OSError, ValueError) as error:
+            raise CommandError(error)
+        elapsed = time.perf_counter() - started
+
+        for line, error in result.errors:
+            self.stderr.write(f"Строка {line}: {error}")
+        self.stdout.write(
+            f"Импортировано заказов: {result.created} из {result.total}, "
+            f"{result.total / elapsed:.0f} строк/с"
+        )
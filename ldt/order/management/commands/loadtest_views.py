@@ -0,0 +1,107 @@
+import asyncio
+import statistics
+import time
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.contrib.sessions.backends.db import SessionStore
+from django.core.management.base import BaseCommand, CommandError
+
+from users.models import User
+
+DEFAULT_PATHS = ("/order/list", "/order/details/1", "/user/userslist")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-tests running servers and compares their throughput, e.g. WSGI started with "
+        "`python manage.py runserver 8000` against ASGI started with "
+        "`uvicorn ldt.asgi:application --port 8001`: "
+        "loadtest_views --server wsgi=http://127.0.0.1:8000 --server asgi=http://127.0.0.1:8001 "
+        "--email admin@example.com. Slow clients are simulated with --read-delay."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--server", action="append", required=True, help="name=base URL, repeatable.")
+        parser.add_argument("--email", required=True, help="Staff user the requests are made as.")
+        parser.add_argument("--path", action="append", help="Paths to request in turn.")
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument(
+            "--read-delay",
+            type=float,
+            default=0,
+            help="Seconds a client waits between 4 KB reads of the response.",
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(email=options["email"]).first()
+        if user is None:
+            raise CommandError(f"Пользователь {options['email']} не найден")
+
+        session = SessionStore()
+        session[SESSION_KEY] = str(user.pk)
+        session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+        session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+        session.create()
+        self.cookie = f"{settings.SESSION_COOKIE_NAME}={session.session_key}"
+
+        paths = options["path"] or DEFAULT_PATHS
+        try:
+            for server in options["server"]:
+                name, _, url = server.partition("=")
+                result = asyncio.run(self.run(url or name, paths, options))
+                self.report(name, result, options["requests"])
+        finally:
+            session.delete()
+
+    async def run(self, url, paths, options):
+        url = urlsplit(url)
+        semaphore = asyncio.Semaphore(options["concurrency"])
+
+        async def request(index):
+            async with semaphore:
+                return await self.fetch(url.hostname, url.port or 80, paths[index % len(paths)],
+                                        options["read_delay"])
+
+        started = time.perf_counter()
+        responses = await asyncio.gather(*(request(index) for index in range(options["requests"])))
+        return responses, time.perf_counter() - started
+
+    async def fetch(self, host, port, path, read_delay):
+        started = time.perf_counter()
+        try:
+            reader, writer = await asyncio.open_connection(host, port)
+        except OSError:
+            return None, time.perf_counter() - started
+
+        writer.write((
+            f"GET {path} HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            f"Cookie: {self.cookie}\r\n"
+            "Connection: close\r\n\r\n"
+        ).encode())
+        await writer.drain()
+
+        status_line = await reader.readline()
+        while await reader.read(4096):
+            if read_delay:
+                await asyncio.sleep(read_delay)
+        writer.close()
+        await writer.wait_closed()
+
+        parts = status_line.split()
+        status = int(parts[1]) if len(parts) > 1 else None
+        return status, time.perf_counter() - started
+
+    def report(self, name, result, total):
+        responses, elapsed = result
+        latencies = sorted(latency for _, latency in responses)
+        failed = sum(1 for status, _ in responses if status != 200)
+        self.stdout.write(self.style.MIGRATE_HEADING(name))
+        self.stdout.write(f"  {total / elapsed:.1f} запросов/с, ошибок: {failed}")
+        self.stdout.write(
+            f"  задержка: медиана {statistics.median(latencies) * 1000:.0f} мс, "
+            f"95% {latencies[int(len(latencies) * 0.95) - 1] * 1000:.0f} мс"
+        )
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from order.models import Order, OrderCounter
+
+
+class Command(BaseCommand):
+    help = "Recalculates the cached order counters from the order table."
+
+    def handle(self, *args, **options):
+        OrderCounter.objects.rebuild()
+        stats = OrderCounter.objects.stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Счётчики пересчитаны: всего {stats['total']}, "
+            f"не назначено {stats['not_assigned']}, в пути {stats['in_progress']}, выполнено {stats['done']}"
+        ))
+        if stats != Order.objects.stats():
+            self.stderr.write("Заказы изменились во время пересчёта, запустите команду ещё раз.")
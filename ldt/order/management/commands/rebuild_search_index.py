@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from order.search import order_search
+from users.search import user_search
+
+
+class Command(BaseCommand):
+    help = (
+        "Refills the SQLite full-text indexes of orders and users from their tables and "
+        "recreates the triggers that keep them current. PostgreSQL maintains its search "
+        "columns itself."
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            self.stdout.write("Поисковые индексы обновляются базой данных, перестраивать нечего.")
+            return
+
+        with transaction.atomic():
+            order_search.rebuild()
+            user_search.rebuild()
+        self.stdout.write(self.style.SUCCESS("Поисковые индексы перестроены."))
@@ -0,0 +1,33 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from order.jobs import run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Renders queued order reports. Runs until interrupted unless --once is given."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Render the queued reports and exit.")
+        parser.add_argument("--interval", type=float, default=2, help="Seconds between queue polls.")
+        parser.add_argument(
+            "--stale-timeout",
+            type=int,
+            default=settings.ORDER_REPORT_STALE_TIMEOUT,
+            help="Seconds after which a report still being rendered is put back into the queue.",
+        )
+
+    def handle(self, *args, **options):
+        stale_timeout = timedelta(seconds=options["stale_timeout"])
+
+        while True:
+            requeued = run_pending_jobs(stale_timeout)
+            if requeued:
+                self.stderr.write(f"Возвращено в очередь зависших отчётов: {requeued}")
+
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
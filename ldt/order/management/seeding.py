@@ -0,0 +1,46 @@
+import random
+from datetime import timedelta
+
+from django.utils import timezone
+
+from order.models import Order
+from users.models import User
+
+BATCH_SIZE = 1000
+
+
+def seed_couriers(count):
+    return User.objects.bulk_create(
+        User(email=f"courier-{index}@seed.local", first_name="Курьер", last_name=str(index))
+        for index in range(count)
+    )
+
+
+def seed_orders(count, couriers, rng=None):
+    rng = rng or random.Random(0)
+    created = 0
+
+    while created < count:
+        size = min(BATCH_SIZE, count - created)
+        orders = []
+        for _ in range(size):
+            employee = rng.choice(couriers) if couriers and rng.random() < 0.9 else None
+            orders.append(Order(
+                status=employee is not None and rng.random() < 0.8,
+                name=f"Заказ {created + len(orders)}",
+                client="Клиент",
+                contact_number="+7 912 345-67-89",
+                payment_method="оплачено",
+                address="Москва",
+                description="Описание заказа " * rng.randint(1, 20),
+                employee=employee,
+            ))
+        orders = Order.objects.bulk_create(orders)
+
+        # creation_time is auto_now_add, so spread each batch over the past year afterwards
+        Order.objects.filter(pk__in=[order.pk for order in orders]).update(
+            creation_time=timezone.now() - timedelta(hours=rng.randint(0, 24 * 365)),
+        )
+        created += size
+
+    return created
@@ -0,0 +1,58 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0008_alter_order_options"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("employee", None), ("status", False)),
+                fields=["-creation_time", "-id"],
+                name="order_not_assigned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("employee__isnull", False), ("status", False)),
+                fields=["-creation_time", "-id"],
+                name="order_assigned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", True)),
+                fields=["-creation_time", "-id"],
+                name="order_done_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", False)),
+                fields=["employee", "-creation_time", "-id"],
+                name="order_employee_assigned_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", True)),
+                fields=["employee", "-creation_time", "-id"],
+                name="order_employee_done_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["creation_time"], name="order_created_idx"),
+        ),
+    ]
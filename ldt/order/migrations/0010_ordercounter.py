@@ -0,0 +1,103 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def fill_order_counters(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+    OrderCounter = apps.get_model("order", "OrderCounter")
+
+    rows = (
+        Order.objects.order_by()
+        .values("employee_id")
+        .annotate(
+            not_assigned=Count("id", filter=Q(employee=None, status=False)),
+            in_progress=Count("id", filter=Q(employee__isnull=False, status=False)),
+            done=Count("id", filter=Q(status=True)),
+        )
+    )
+    totals = {"not_assigned": 0, "in_progress": 0, "done": 0}
+    counters = []
+    for row in rows:
+        employee_id = row.pop("employee_id")
+        for bucket, value in row.items():
+            totals[bucket] += value
+            if employee_id is not None:
+                counters.append(OrderCounter(employee_id=employee_id, bucket=bucket, value=value))
+    counters.extend(
+        OrderCounter(employee_id=None, bucket=bucket, value=value)
+        for bucket, value in totals.items()
+    )
+    OrderCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0009_order_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="OrderCounter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "bucket",
+                    models.CharField(
+                        choices=[
+                            ("not_assigned", "Не назначен"),
+                            ("in_progress", "В пути"),
+                            ("done", "Доставлен"),
+                        ],
+                        max_length=20,
+                        verbose_name="Статус",
+                    ),
+                ),
+                ("value", models.IntegerField(default=0, verbose_name="Количество")),
+                (
+                    "employee",
+                    models.ForeignKey(
+                        blank=True,
+                        help_text="Исполнитель, по заказам которого ведётся счётчик. Пусто — все заказы.",
+                        null=True,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="order_counters",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Исполнитель",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Счётчик заказов",
+                "verbose_name_plural": "Счётчики заказов",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="ordercounter",
+            constraint=models.UniqueConstraint(
+                fields=("employee", "bucket"),
+                name="order_counter_employee_bucket_unique",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="ordercounter",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("employee", None)),
+                fields=("bucket",),
+                name="order_counter_total_bucket_unique",
+            ),
+        ),
+        migrations.RunPython(fill_order_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0010_ordercounter"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "data_range",
+                    models.CharField(
+                        choices=[("day", "За день"), ("month", "За месяц")],
+                        max_length=10,
+                        verbose_name="Период",
+                    ),
+                ),
+                ("period_start", models.DateTimeField(verbose_name="Начало периода")),
+                ("period_end", models.DateTimeField(verbose_name="Конец периода")),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Формируется"),
+                            ("done", "Готов"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Статус",
+                    ),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="reports", verbose_name="Файл отчёта"
+                    ),
+                ),
+                ("error", models.TextField(blank=True, verbose_name="Ошибка")),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Начало формирования"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Окончание формирования"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Отчёт",
+                "verbose_name_plural": "Отчёты",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="reportjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("status__in", ["pending", "running"])),
+                fields=("data_range", "period_start", "period_end"),
+                name="report_job_active_unique",
+            ),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0011_reportjob"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="reportjob",
+            name="data_version",
+            field=models.CharField(
+                blank=True,
+                help_text="Количество и последний номер заказов периода на момент формирования отчёта.",
+                max_length=50,
+                verbose_name="Версия данных",
+            ),
+        ),
+        migrations.AddField(
+            model_name="reportjob",
+            name="last_accessed_at",
+            field=models.DateTimeField(
+                blank=True, null=True, verbose_name="Последнее скачивание"
+            ),
+        ),
+        migrations.AddField(
+            model_name="reportjob",
+            name="size",
+            field=models.PositiveBigIntegerField(
+                default=0, verbose_name="Размер файла"
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0012_reportjob_cache"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="reportjob",
+            name="data_range",
+            field=models.CharField(
+                choices=[
+                    ("day", "За день"),
+                    ("month", "За месяц"),
+                    ("custom", "За период"),
+                ],
+                max_length=10,
+                verbose_name="Период",
+            ),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:35
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    Order = apps.get_model("order", "Order")
+    Order.objects.update(updated_at=F("creation_time"))
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0013_reportjob_custom_range"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_index=True,
+                help_text="Дата и время последнего изменения этого заказа.",
+                verbose_name="Дата изменения",
+            ),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
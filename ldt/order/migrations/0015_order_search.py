@@ -0,0 +1,27 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:10
+
+from django.db import migrations
+
+from order.search import CreateSearchIndex, SearchIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("order", "0014_order_updated_at"),
+    ]
+
+    operations = [
+        CreateSearchIndex(
+            SearchIndex(
+                "order_order",
+                {
+                    "name": "A",
+                    "client": "B",
+                    "contact_number": "B",
+                    "address": "C",
+                    "description": "D",
+                },
+                digit_columns=("contact_number",),
+            )
+        ),
+    ]
@@ -1,15 +1,60 @@
-from datetime import datetime
+import tempfile
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
 from django.utils import timezone
 
-import phonenumbers
 from django.conf import settings
-from django.core.exceptions import ValidationError
-from django.db import models
+from django.core.files import File
+from django.db import IntegrityError, connections, models, transaction
+from django.db.models import Count, F, Max, Q
+from django.db.models.functions import Left
+from django.dispatch import Signal
 from django.utils.translation import gettext_lazy as _
+from order.phones import format_phone_number, normalize_phone_number
+from order.reports import OrderReport
+
+
+DESCRIPTION_PREVIEW_LENGTH = 200
+
+NOT_ASSIGNED = 'not_assigned'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+
+# sent after queryset updates and bulk deletes, which post_save and post_delete do not see;
+# shifts are the (previous status bucket, new status bucket or None, count) moves they made,
+# a delete also passes deleted=True and the period of the orders' creation times
+orders_changed = Signal()
+
+
+def get_status_bucket(employee_id, status):
+    if status:
+        return DONE
+    if employee_id is None:
+        return NOT_ASSIGNED
+    return IN_PROGRESS
+
+
+def status_bucket_aggregates():
+    return {
+        NOT_ASSIGNED: Count('id', filter=Q(employee=None, status=False)),
+        IN_PROGRESS: Count('id', filter=Q(employee__isnull=False, status=False)),
+        DONE: Count('id', filter=Q(status=True)),
+    }
 
 
 class OrderManager(models.Manager):
 
+    def for_board(self):
+        return self.defer("description").annotate(
+            description_preview=Left("description", DESCRIPTION_PREVIEW_LENGTH + 1),
+        )
+
+    def stats(self, employee=None):
+        queryset = self.all() if employee is None else self.filter(employee=employee)
+        stats = queryset.aggregate(**status_bucket_aggregates())
+        stats['total'] = sum(stats.values())
+        return stats
+
     def get_orders_count_for_employee(self, user):
         return self.filter(employee=user).count()
 
@@ -17,19 +62,130 @@ class OrderManager(models.Manager):
         return self.filter(employee=user, status=True).count()
 
     def orders_without_employee(self):
-        return self.filter(employee=None, status=False)
+        return self.for_board().filter(employee=None, status=False)
 
     def orders_with_employee_false_status(self):
-        return self.filter(employee__isnull=False, status=False)
+        return self.for_board().filter(employee__isnull=False, status=False)
 
     def orders_with_status_true(self):
-        return self.filter(status=True)
+        return self.for_board().filter(status=True)
 
     def orders_with_employee_false_status_for_employee(self, employee_id):
-        return self.filter(employee=employee_id, status=False)
+        return self.for_board().filter(employee=employee_id, status=False)
 
     def orders_with_status_true_for_employee(self, employee_id):
-        return self.filter(employee=employee_id, status=True)
+        return self.for_board().filter(employee=employee_id, status=True)
+
+    @transaction.atomic
+    def update_orders(self, queryset, **values):
+        # the rows stay locked until the update, so the moves below are the ones it makes
+        rows = list(queryset.select_for_update().values_list('pk', 'employee_id', 'status'))
+        groups = defaultdict(list)
+        for pk, employee_id, status in rows:
+            groups[employee_id, status].append(pk)
+        if not groups:
+            return []
+
+        # a row only matches while it still has the values it was read with
+        unchanged = Q()
+        for (employee_id, status), pks in groups.items():
+            unchanged |= Q(pk__in=pks, employee_id=employee_id, status=status)
+        # update() skips auto_now
+        updated = self.filter(unchanged).update(**values, updated_at=timezone.now())
+        if not updated:
+            return []
+
+        if updated == len(rows):
+            pks = [pk for pk, _, _ in rows]
+            shifts = []
+            for (employee_id, status), group in groups.items():
+                new_employee_id = values.get('employee_id', employee_id)
+                new_status = values.get('status', status)
+                shifts.append((
+                    (employee_id, get_status_bucket(employee_id, status)),
+                    (new_employee_id, get_status_bucket(new_employee_id, new_status)),
+                    len(group),
+                ))
+        else:
+            # only on databases without row locks: some rows were changed in between,
+            # the receivers recount instead of guessing which moves were ours
+            pks = list(self.filter(pk__in=[pk for pk, _, _ in rows], **values).values_list('pk', flat=True))
+            shifts = None
+        orders_changed.send(sender=self.model, pks=pks, fields=list(values), shifts=shifts)
+        return pks
+
+    def set_status(self, pk, status):
+        return bool(self.bulk_set_status([pk], status))
+
+    def bulk_set_status(self, pks, status):
+        connection = connections[self.db]
+        if not pks or not (connection.vendor == 'postgresql' or
+                           connection.vendor == 'sqlite' and connection.features.can_return_columns_from_insert):
+            return self.update_orders(self.filter(pk__in=pks, status=not status), status=status)
+
+        # the WHERE already fixes the status the rows had, so UPDATE ... RETURNING their couriers is all
+        # the counters need: no rows are read or locked beforehand, and a no-op writes nothing
+        quote = connection.ops.quote_name
+        opts = self.model._meta
+        pk_column, employee_column, status_column, updated_column = (
+            quote(opts.get_field(name).column) for name in ('id', 'employee', 'status', 'updated_at')
+        )
+        with transaction.atomic(using=self.db), connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {quote(opts.db_table)} SET {status_column} = %s, {updated_column} = %s "
+                f"WHERE {pk_column} IN ({', '.join(['%s'] * len(pks))}) AND {status_column} = %s "
+                f"RETURNING {pk_column}, {employee_column}",
+                [status, connection.ops.adapt_datetimefield_value(timezone.now()), *pks, not status],
+            )
+            rows = cursor.fetchall()
+            if not rows:
+                return []
+            moves = Counter(employee_id for _, employee_id in rows)
+            shifts = [
+                (
+                    (employee_id, get_status_bucket(employee_id, not status)),
+                    (employee_id, get_status_bucket(employee_id, status)),
+                    count,
+                )
+                for employee_id, count in moves.items()
+            ]
+            pks = [pk for pk, _ in rows]
+            orders_changed.send(sender=self.model, pks=pks, fields=['status'], shifts=shifts)
+        return pks
+
+    def bulk_assign(self, pks, employee):
+        return self.update_orders(self.filter(pk__in=pks).exclude(employee=employee), employee_id=employee.pk)
+
+    @transaction.atomic
+    def bulk_delete(self, pks):
+        rows = list(
+            self.filter(pk__in=pks).select_for_update().values_list('pk', 'employee_id', 'status', 'creation_time')
+        )
+        if not rows:
+            return 0
+
+        # QuerySet.delete() would load every order to send post_delete for it; nothing references
+        # orders, so one DELETE is enough and orders_changed below does the receivers' work at once
+        pks = [pk for pk, _, _, _ in rows]
+        opts = self.model._meta
+        quote = connections[self.db].ops.quote_name
+        with connections[self.db].cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {quote(opts.db_table)} WHERE {quote(opts.pk.column)} IN ({', '.join(['%s'] * len(pks))})",
+                pks,
+            )
+            deleted = cursor.rowcount
+        moves = Counter((employee_id, get_status_bucket(employee_id, status)) for _, employee_id, status, _ in rows)
+        creation_times = [creation_time for _, _, _, creation_time in rows]
+        orders_changed.send(
+            sender=self.model,
+            pks=pks,
+            fields=[],
+            shifts=[(previous, None, count) for previous, count in moves.items()],
+            deleted=True,
+            period=(min(creation_times), max(creation_times)),
+        )
+        return deleted
 
     def orders_created_this_month(self):
         current_date = timezone.now()
@@ -42,6 +198,22 @@ class OrderManager(models.Manager):
         end_of_day = current_date.replace(hour=23, minute=59, second=59, microsecond=999999)
         return self.filter(creation_time__range=(start_of_day, end_of_day))
 
+    def orders_created_between(self, start, end):
+        return self.filter(creation_time__gte=start, creation_time__lt=end)
+
+    async def aversion(self, employee=None):
+        # every edit moves the latest updated_at, found through its index; the status counters
+        # also change when an order is added, taken away or deleted, without counting the table
+        queryset = self.all() if employee is None else self.filter(employee=employee)
+        version = await queryset.aaggregate(last_modified=Max('updated_at'))
+        counters = OrderCounter.objects.filter(employee=employee).order_by('bucket').values_list('bucket', 'value')
+        version['counters'] = [counter async for counter in counters]
+        return version
+
+    def report_version(self, start, end):
+        marker = self.orders_created_between(start, end).aggregate(count=Count('id'), last=Max('id'))
+        return f"{marker['count']}-{marker['last'] or 0}"
+
 
 class Order(models.Model):
     objects = OrderManager()
@@ -62,6 +234,12 @@ class Order(models.Model):
         verbose_name=_('Дата создания'),
         help_text=_('Дата и время создания этого заказа.')
     )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        db_index=True,
+        verbose_name=_('Дата изменения'),
+        help_text=_('Дата и время последнего изменения этого заказа.')
+    )
     delivery_date = models.DateTimeField(
         null=True,
         blank=True,
@@ -120,23 +298,397 @@ class Order(models.Model):
         ordering = ['-creation_time']
         verbose_name = _('Заказ')
         verbose_name_plural = _('Заказы')
+        indexes = [
+            models.Index(
+                fields=['-creation_time', '-id'],
+                condition=models.Q(employee=None, status=False),
+                name='order_not_assigned_idx',
+            ),
+            models.Index(
+                fields=['-creation_time', '-id'],
+                condition=models.Q(employee__isnull=False, status=False),
+                name='order_assigned_idx',
+            ),
+            models.Index(
+                fields=['-creation_time', '-id'],
+                condition=models.Q(status=True),
+                name='order_done_idx',
+            ),
+            models.Index(
+                fields=['employee', '-creation_time', '-id'],
+                condition=models.Q(status=False),
+                name='order_employee_assigned_idx',
+            ),
+            models.Index(
+                fields=['employee', '-creation_time', '-id'],
+                condition=models.Q(status=True),
+                name='order_employee_done_idx',
+            ),
+            models.Index(fields=['creation_time'], name='order_created_idx'),
+        ]
 
     def clean(self):
         super().clean()
         if self.contact_number:
-            try:
-                parsed_number = phonenumbers.parse(self.contact_number, None)
-                if not phonenumbers.is_valid_number(parsed_number):
-                    raise ValidationError(_("Неверный формат номера телефона."))
-            except phonenumbers.NumberParseException:
-                raise ValidationError(_("Неверный формат номера телефона."))
+            normalize_phone_number(self.contact_number)
 
     def save(self, *args, **kwargs):
-        if self.contact_number:
-            parsed_number = phonenumbers.parse(self.contact_number, None)
-            formatted_number = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
-            self.contact_number = formatted_number
-        super().save(*args, **kwargs)
+        deferred_fields = self.get_deferred_fields()
+        # a number loaded from the database was normalized when it was saved
+        if 'contact_number' not in deferred_fields and self.contact_number and \
+                self.contact_number != getattr(self, '_loaded_values', {}).get('contact_number'):
+            self.contact_number = format_phone_number(self.contact_number)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = {*update_fields, 'updated_at'}
+        with transaction.atomic():
+            if update_fields is None or {'employee', 'employee_id', 'status'} & set(update_fields):
+                self.previous_status_bucket = self.lock_status_bucket()
+            super().save(*args, **kwargs)
+        self._loaded_values = {
+            field.attname: getattr(self, field.attname)
+            for field in self._meta.concrete_fields
+            if field.attname not in deferred_fields
+        }
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            self.previous_status_bucket = self.lock_status_bucket()
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def refresh_from_db(self, using=None, fields=None, **kwargs):
+        super().refresh_from_db(using, fields, **kwargs)
+        deferred_fields = self.get_deferred_fields()
+        self._loaded_values = {
+            **getattr(self, '_loaded_values', {}),
+            **{
+                field.attname: getattr(self, field.attname)
+                for field in self._meta.concrete_fields
+                if field.attname not in deferred_fields and (fields is None or {field.name, field.attname} & set(fields))
+            },
+        }
+
+    def lock_status_bucket(self):
+        # the counters move from the row as it is now: the instance may have been loaded before another save moved it
+        if self.pk is None:
+            return None
+        row = type(self)._base_manager.select_for_update().filter(pk=self.pk).values_list('employee_id', 'status')
+        for employee_id, status in row:
+            return employee_id, get_status_bucket(employee_id, status)
+        return None
+
+    @property
+    def status_bucket(self):
+        return self.employee_id, get_status_bucket(self.employee_id, self.status)
 
     def __str__(self):
         return self.name
+
+
+class OrderCounterManager(models.Manager):
+
+    def stats(self, employee=None):
+        stats = dict.fromkeys((NOT_ASSIGNED, IN_PROGRESS, DONE), 0)
+        stats.update(self.filter(employee=employee).values_list('bucket', 'value'))
+        stats['total'] = sum(stats.values())
+        return stats
+
+    def shift(self, previous, current, count=1):
+        self.shift_many([(previous, current, count)])
+
+    def shift_many(self, shifts):
+        # sums the moves first, so each counter is updated once however many orders moved
+        deltas = Counter()
+        for previous, current, count in shifts:
+            for status_bucket, delta in ((previous, -count), (current, count)):
+                if status_bucket is None:
+                    continue
+                employee_id, bucket = status_bucket
+                for scope in {None, employee_id}:
+                    deltas[scope, bucket] += delta
+        for (employee_id, bucket), delta in deltas.items():
+            if delta:
+                self.add(employee_id, bucket, delta)
+
+    def add(self, employee_id, bucket, delta):
+        counters = self.filter(employee_id=employee_id, bucket=bucket)
+        if counters.update(value=F('value') + delta) or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                self.create(employee_id=employee_id, bucket=bucket, value=delta)
+        except IntegrityError:
+            counters.update(value=F('value') + delta)
+
+    @transaction.atomic
+    def rebuild(self):
+        rows = Order.objects.order_by().values('employee_id').annotate(**status_bucket_aggregates())
+        totals = dict.fromkeys((NOT_ASSIGNED, IN_PROGRESS, DONE), 0)
+        counters = []
+        for row in rows:
+            employee_id = row.pop('employee_id')
+            for bucket, value in row.items():
+                totals[bucket] += value
+                if employee_id is not None:
+                    counters.append(self.model(employee_id=employee_id, bucket=bucket, value=value))
+        counters.extend(self.model(employee_id=None, bucket=bucket, value=value) for bucket, value in totals.items())
+
+        self.all().delete()
+        self.bulk_create(counters)
+
+
+class OrderCounter(models.Model):
+    objects = OrderCounterManager()
+
+    BUCKET_CHOICES = [
+        (NOT_ASSIGNED, _('Не назначен')),
+        (IN_PROGRESS, _('В пути')),
+        (DONE, _('Доставлен')),
+    ]
+
+    employee = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        related_name='order_counters',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        verbose_name=_('Исполнитель'),
+        help_text=_('Исполнитель, по заказам которого ведётся счётчик. Пусто — все заказы.')
+    )
+    bucket = models.CharField(
+        max_length=20,
+        choices=BUCKET_CHOICES,
+        verbose_name=_('Статус'),
+    )
+    value = models.IntegerField(
+        default=0,
+        verbose_name=_('Количество'),
+    )
+
+    class Meta:
+        verbose_name = _('Счётчик заказов')
+        verbose_name_plural = _('Счётчики заказов')
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'bucket'], name='order_counter_employee_bucket_unique'),
+            models.UniqueConstraint(
+                fields=['bucket'],
+                condition=models.Q(employee=None),
+                name='order_counter_total_bucket_unique',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.employee or _("Все заказы")}: {self.get_bucket_display()} — {self.value}'
+
+
+class ReportJobManager(models.Manager):
+
+    def enqueue(self, data_range, period_start, period_end):
+        cached = self.cached(data_range, period_start, period_end)
+        if cached is not None:
+            return cached
+
+        active = self.filter(
+            data_range=data_range,
+            period_start=period_start,
+            period_end=period_end,
+            status__in=(ReportJob.PENDING, ReportJob.RUNNING),
+        )
+        job = active.first()
+        if job is not None:
+            return job
+        try:
+            with transaction.atomic():
+                return self.create(data_range=data_range, period_start=period_start, period_end=period_end)
+        except IntegrityError:
+            return active.get()
+
+    def cached(self, data_range, period_start, period_end):
+        job = self.filter(
+            data_range=data_range,
+            period_start=period_start,
+            period_end=period_end,
+            status=ReportJob.DONE,
+            data_version=Order.objects.report_version(period_start, period_end),
+        ).first()
+        if job is None or not job.file or not job.file.storage.exists(job.file.name):
+            return None
+        job.touch()
+        return job
+
+    def invalidate(self, creation_time, last_creation_time=None):
+        return self.filter(
+            period_start__lte=last_creation_time or creation_time,
+            period_end__gt=creation_time,
+            status__in=(ReportJob.RUNNING, ReportJob.DONE),
+        ).exclude(data_version='').update(data_version='')
+
+    def evict(self, max_size):
+        total = 0
+        for position, job in enumerate(self.filter(status=ReportJob.DONE).order_by('-last_accessed_at')):
+            total += job.size
+            # the most recently used report is always kept, even when it alone exceeds the limit
+            if position and total > max_size:
+                job.file.delete(save=False)
+                job.delete()
+
+    def claim(self):
+        for job in self.filter(status=ReportJob.PENDING).order_by('created_at')[:10]:
+            now = timezone.now()
+            if self.filter(pk=job.pk, status=ReportJob.PENDING).update(status=ReportJob.RUNNING, started_at=now):
+                job.status = ReportJob.RUNNING
+                job.started_at = now
+                return job
+        return None
+
+    def requeue_stale(self, timeout):
+        return self.filter(
+            status=ReportJob.RUNNING,
+            started_at__lt=timezone.now() - timeout,
+        ).update(status=ReportJob.PENDING, started_at=None)
+
+
+class ReportJob(models.Model):
+    objects = ReportJobManager()
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, _('В очереди')),
+        (RUNNING, _('Формируется')),
+        (DONE, _('Готов')),
+        (FAILED, _('Ошибка')),
+    ]
+    RANGE_CHOICES = [
+        ('day', _('За день')),
+        ('month', _('За месяц')),
+        ('custom', _('За период')),
+    ]
+
+    data_range = models.CharField(
+        max_length=10,
+        choices=RANGE_CHOICES,
+        verbose_name=_('Период'),
+    )
+    period_start = models.DateTimeField(
+        verbose_name=_('Начало периода'),
+    )
+    period_end = models.DateTimeField(
+        verbose_name=_('Конец периода'),
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name=_('Статус'),
+    )
+    file = models.FileField(
+        upload_to='reports',
+        blank=True,
+        verbose_name=_('Файл отчёта'),
+    )
+    data_version = models.CharField(
+        max_length=50,
+        blank=True,
+        verbose_name=_('Версия данных'),
+        help_text=_('Количество и последний номер заказов периода на момент формирования отчёта.')
+    )
+    size = models.PositiveBigIntegerField(
+        default=0,
+        verbose_name=_('Размер файла'),
+    )
+    last_accessed_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Последнее скачивание'),
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name=_('Ошибка'),
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name=_('Дата создания'),
+    )
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Начало формирования'),
+    )
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Окончание формирования'),
+    )
+
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name = _('Отчёт')
+        verbose_name_plural = _('Отчёты')
+        constraints = [
+            models.UniqueConstraint(
+                fields=['data_range', 'period_start', 'period_end'],
+                condition=models.Q(status__in=['pending', 'running']),
+                name='report_job_active_unique',
+            ),
+        ]
+
+    @property
+    def period_label(self):
+        start = timezone.localtime(self.period_start)
+        if self.data_range == 'day':
+            return start.strftime('%d.%m.%y')
+        end = timezone.localtime(self.period_end) - timedelta(days=1)
+        return f"{start.strftime('%d-%m-%Y')} - {end.strftime('%d-%m-%Y')}"
+
+    @property
+    def subtitle(self):
+        if self.data_range == 'day':
+            return f'Отчет по заказам за {self.period_label}'
+        return f"Отчет по заказам с {self.period_label.replace(' - ', ' по ')}"
+
+    @property
+    def basename(self):
+        return f'Report  ({self.period_label})'
+
+    @property
+    def filename(self):
+        return f'{self.basename}.pdf'
+
+    def touch(self):
+        self.last_accessed_at = timezone.now()
+        ReportJob.objects.filter(pk=self.pk).update(last_accessed_at=self.last_accessed_at)
+
+    def run(self):
+        # saved straight away so that order changes made during rendering can reset it
+        self.data_version = Order.objects.report_version(self.period_start, self.period_end)
+        ReportJob.objects.filter(pk=self.pk).update(data_version=self.data_version)
+
+        try:
+            with tempfile.TemporaryFile() as output:
+                orders = Order.objects.orders_created_between(self.period_start, self.period_end)
+                OrderReport(orders, self.subtitle).build(output)
+                self.size = output.tell()
+                output.seek(0)
+                self.file.save(f'report-{self.pk}.pdf', File(output), save=False)
+        except Exception as error:
+            self.status = self.FAILED
+            self.error = repr(error)
+        else:
+            self.status = self.DONE
+        self.finished_at = self.last_accessed_at = timezone.now()
+        self.save(update_fields=['status', 'file', 'size', 'error', 'finished_at', 'last_accessed_at'])
+
+        ReportJob.objects.evict(settings.ORDER_REPORT_CACHE_MAX_SIZE)
+
+    def __str__(self):
+        return f'{self.subtitle} ({self.get_status_display()})'
@@ -0,0 +1,58 @@
+import base64
+from datetime import datetime
+
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+
+PAGE_SIZE = 30
+CURSOR_ORDERING = ("-creation_time", "-id")
+
+
+def encode_cursor(order):
+    raw = f"{order.creation_time.isoformat()}|{order.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor.encode()).decode()
+        creation_time, pk = raw.rsplit("|", 1)
+        return datetime.fromisoformat(creation_time), int(pk)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor!r}")
+
+
+def keyset_slice(queryset, cursor=None, page_size=PAGE_SIZE):
+    queryset = queryset.order_by(*CURSOR_ORDERING)
+
+    if cursor:
+        creation_time, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(creation_time__lt=creation_time) | Q(creation_time=creation_time, id__lt=pk)
+        )
+
+    # one extra row tells whether there is a next page
+    return queryset[:page_size + 1]
+
+
+def split_page(orders, page_size=PAGE_SIZE):
+    next_cursor = encode_cursor(orders[page_size - 1]) if len(orders) > page_size else None
+    return orders[:page_size], next_cursor
+
+
+def keyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    return split_page(list(keyset_slice(queryset, cursor, page_size)), page_size)
+
+
+async def akeyset_page(queryset, cursor=None, page_size=PAGE_SIZE):
+    orders = [order async for order in keyset_slice(queryset, cursor, page_size).aiterator()]
+    return split_page(orders, page_size)
+
+
+@sync_to_async
+def aget_page(paginator, number):
+    # Paginator has no async API: the count and the page are read in a worker thread,
+    # so that templates get a list instead of a queryset they would query from the event loop
+    page = paginator.get_page(number)
+    page.object_list = list(page.object_list)
+    return page
@@ -0,0 +1,38 @@
+from functools import lru_cache
+
+import phonenumbers
+from django.core.exceptions import ValidationError
+from django.utils.translation import gettext_lazy as _
+
+PHONE_NUMBER_CACHE_SIZE = 10_000
+
+
+@lru_cache(maxsize=PHONE_NUMBER_CACHE_SIZE)
+def parse_phone_number(value):
+    parsed_number = phonenumbers.parse(value, None)
+    formatted_number = phonenumbers.format_number(parsed_number, phonenumbers.PhoneNumberFormat.INTERNATIONAL)
+    return formatted_number, phonenumbers.is_valid_number(parsed_number)
+
+
+def format_phone_number(value):
+    return parse_phone_number(value)[0]
+
+
+def normalize_phone_number(value):
+    try:
+        formatted_number, valid = parse_phone_number(value)
+    except phonenumbers.NumberParseException:
+        raise ValidationError(_("Неверный формат номера телефона."))
+    if not valid:
+        raise ValidationError(_("Неверный формат номера телефона."))
+    return formatted_number
+
+
+def normalize_phone_numbers(values):
+    normalized = {}
+    for value in set(values):
+        try:
+            normalized[value] = normalize_phone_number(value)
+        except ValidationError as error:
+            normalized[value] = error
+    return normalized
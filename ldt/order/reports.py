@@ -0,0 +1,129 @@
+from datetime import datetime, time, timedelta
+from pathlib import Path
+
+from django.utils import timezone
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.styles import ParagraphStyle
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFont
+from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph
+
+REPORT_BATCH_SIZE = 200
+REPORT_HEADER = ['№', 'Название', "Исполнитель", 'Дата', 'Время', "Цена"]
+
+
+def get_report_period(data_range, now=None):
+    start = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0)
+    if data_range == "month":
+        start = start.replace(day=1)
+        return start, (start + timedelta(days=32)).replace(day=1)
+    return start, start + timedelta(days=1)
+
+
+def get_custom_period(date_from, date_to):
+    start = timezone.make_aware(datetime.combine(date_from, time.min))
+    end = timezone.make_aware(datetime.combine(date_to + timedelta(days=1), time.min))
+    return start, end
+
+
+class LazyStory(list):
+    # SimpleDocTemplate.build consumes the story from the front, so the next
+    # flowables are only created once the previous ones have been laid out.
+
+    def __init__(self, flowables, pending):
+        super().__init__(flowables)
+        self.pending = iter(pending)
+        self.refill()
+
+    def refill(self):
+        # keep a flowable of lookahead for keepWithNext handling
+        while len(self) < 2:
+            flowable = next(self.pending, None)
+            if flowable is None:
+                break
+            self.append(flowable)
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self.refill()
+
+
+class OrderReport:
+    font_name = "Roboto-Black"
+    font_path = Path(__file__).resolve().parent / "fonts" / "Roboto-Black.ttf"
+
+    title_style = None
+    subtitle_style = None
+    table_style = None
+
+    def __init__(self, orders, subtitle):
+        self.orders = orders
+        self.subtitle = subtitle
+
+    @classmethod
+    def setup(cls):
+        if cls.font_name not in pdfmetrics.getRegisteredFontNames():
+            pdfmetrics.registerFont(TTFont(cls.font_name, cls.font_path))
+
+        cls.title_style = ParagraphStyle(
+            "Title",
+            fontName=cls.font_name,
+            fontSize=18,
+            textColor=colors.black,
+            alignment=1,
+            spaceAfter=12
+        )
+        cls.subtitle_style = ParagraphStyle(
+            "Subtitle",
+            fontName=cls.font_name,
+            fontSize=14,
+            textColor=colors.black,
+            alignment=1,
+            spaceAfter=12
+        )
+        cls.table_style = TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), cls.font_name),
+            ('BACKGROUND', (0, 0), (-1, 0), colors.white),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), cls.font_name),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ])
+
+    def iter_rows(self):
+        orders = self.orders.select_related("employee").only(
+            "id", "name", "creation_time", "price",
+            "employee__email", "employee__first_name", "employee__last_name", "employee__middle_name",
+        )
+        for order in orders.iterator(chunk_size=REPORT_BATCH_SIZE):
+            yield (order.id, order.name, order.employee or "", order.creation_time.strftime("%d-%m-%Y"),
+                   order.creation_time.strftime("%H:%M"), order.price)
+
+    def iter_tables(self):
+        batch = []
+        empty = True
+        for row in self.iter_rows():
+            batch.append(row)
+            if len(batch) == REPORT_BATCH_SIZE:
+                yield self.make_table(batch)
+                batch = []
+                empty = False
+
+        if batch or empty:
+            yield self.make_table(batch)
+
+    def make_table(self, rows):
+        table = Table([REPORT_HEADER, *rows], repeatRows=1)
+        table.setStyle(self.table_style)
+        return table
+
+    def build(self, output):
+        if self.table_style is None:
+            self.setup()
+
+        doc = SimpleDocTemplate(output, pagesize=A4, pageCompression=1)
+        story = [Paragraph("Отчет", self.title_style), Paragraph(self.subtitle, self.subtitle_style)]
+        doc.build(LazyStory(story, self.iter_tables()))
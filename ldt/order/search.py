@@ -0,0 +1,235 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.migrations.operations.base import Operation
+
+SEARCH_PAGE_SIZE = 20
+SEARCH_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# bm25() column weights for SQLite, the matching setweight() labels for PostgreSQL
+SEARCH_WEIGHTS = {"A": 10.0, "B": 5.0, "C": 2.0, "D": 1.0}
+
+
+def search_terms(query):
+    # unicode61 and to_tsvector lowercase but keep ё apart from е, the indexed text is folded the same way
+    return [term.lower().replace("ё", "е") for term in SEARCH_TOKEN_RE.findall(query)]
+
+
+class SearchIndex:
+    """
+    Full-text index over some text columns of a table, kept up to date by the database itself:
+    an FTS5 table filled by triggers on SQLite, a generated tsvector column on PostgreSQL.
+    Every term of a query has to match the start of a word, results come best first.
+    """
+
+    def __init__(self, table, columns, digit_columns=()):
+        # columns maps a column to its weight, digit_columns are indexed once more without
+        # separators so that a phone number can be found as it is typed
+        self.table = table
+        self.columns = columns
+        self.digit_columns = digit_columns
+
+    @property
+    def fts_table(self):
+        return f"{self.table}_search"
+
+    @property
+    def fts_columns(self):
+        return [*self.columns, *(f"{column}_digits" for column in self.digit_columns)]
+
+    @property
+    def weights(self):
+        labels = [*self.columns.values(), *(self.columns[column] for column in self.digit_columns)]
+        return [SEARCH_WEIGHTS[label] for label in labels]
+
+    def sqlite_values(self, row):
+        folded = [f"replace(replace(coalesce({row}.{column}, ''), 'ё', 'е'), 'Ё', 'Е')" for column in self.columns]
+        digits = [f"coalesce({row}.{column}, '')" for column in self.digit_columns]
+        for separator in (" ", "-", "+", "(", ")"):
+            digits = [f"replace({value}, '{separator}', '')" for value in digits]
+        # once more without the country code, as the number is usually dictated
+        digits = [f"{value} || ' ' || substr({value}, 2)" for value in digits]
+        return ", ".join(folded + digits)
+
+    def sqlite_sql(self):
+        columns = ", ".join(self.fts_columns)
+        fts, table = self.fts_table, self.table
+        return [
+            # contentless: the text already lives in the table, the index only keeps the terms
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='', "
+            f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_insert AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {self.sqlite_values('new')}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_delete AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {self.sqlite_values('old')}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {fts}_update AFTER UPDATE OF {', '.join(self.columns)} ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {self.sqlite_values('old')}); "
+            f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {self.sqlite_values('new')}); END",
+        ]
+
+    def sqlite_rebuild_sql(self):
+        return [
+            f"INSERT INTO {self.fts_table}({self.fts_table}) VALUES ('delete-all')",
+            f"INSERT INTO {self.fts_table}(rowid, {', '.join(self.fts_columns)}) "
+            f"SELECT id, {self.sqlite_values(self.table)} FROM {self.table}",
+        ]
+
+    def sqlite_drop_sql(self):
+        return [
+            *(f"DROP TRIGGER IF EXISTS {self.fts_table}_{event}" for event in ("insert", "delete", "update")),
+            f"DROP TABLE IF EXISTS {self.fts_table}",
+        ]
+
+    def postgresql_vector(self):
+        vectors = [
+            f"setweight(to_tsvector('simple', translate(coalesce({column}, ''), 'ёЁ', 'еЕ')), '{weight}')"
+            for column, weight in self.columns.items()
+        ]
+        for column in self.digit_columns:
+            digits = f"regexp_replace(coalesce({column}, ''), '\\D', '', 'g')"
+            vectors.append(
+                f"setweight(to_tsvector('simple', {digits} || ' ' || substr({digits}, 2)), '{self.columns[column]}')"
+            )
+        return " || ".join(vectors)
+
+    def postgresql_sql(self):
+        return [
+            f"ALTER TABLE {self.table} ADD COLUMN IF NOT EXISTS search_vector tsvector "
+            f"GENERATED ALWAYS AS ({self.postgresql_vector()}) STORED",
+            f"CREATE INDEX IF NOT EXISTS {self.table}_search_vector ON {self.table} USING gin (search_vector)",
+        ]
+
+    def postgresql_drop_sql(self):
+        return [
+            f"DROP INDEX IF EXISTS {self.table}_search_vector",
+            f"ALTER TABLE {self.table} DROP COLUMN IF EXISTS search_vector",
+        ]
+
+    def create_sql(self, vendor):
+        if vendor == "sqlite":
+            return [*self.sqlite_sql(), *self.sqlite_rebuild_sql()]
+        if vendor == "postgresql":
+            return self.postgresql_sql()
+        return []
+
+    def drop_sql(self, vendor):
+        if vendor == "sqlite":
+            return self.sqlite_drop_sql()
+        if vendor == "postgresql":
+            return self.postgresql_drop_sql()
+        return []
+
+    def rebuild(self, using=DEFAULT_DB_ALIAS):
+        connection = connections[using]
+        statements = [*self.sqlite_sql(), *self.sqlite_rebuild_sql()] if connection.vendor == "sqlite" else []
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def restore(self, using=DEFAULT_DB_ALIAS, **kwargs):
+        # SQLite drops the triggers along with the table whenever a migration remakes it
+        connection = connections[using]
+        if connection.vendor != "sqlite":
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT count(*) FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND tbl_name = %s "
+                "AND name LIKE %s)",
+                [self.fts_table, self.table, f"{self.fts_table}_%"],
+            )
+            found = cursor.fetchone()[0]
+        if found and found < 4:
+            self.rebuild(using)
+
+    def match_sql(self, terms):
+        if connection.vendor == "sqlite":
+            query = " ".join(f'"{term}"*' for term in terms)
+            return (
+                f"FROM {self.fts_table} WHERE {self.fts_table} MATCH %s",
+                "rowid",
+                f"bm25({self.fts_table}, {', '.join(map(str, self.weights))}), rowid DESC",
+                [query],
+            )
+        if connection.vendor == "postgresql":
+            query = " & ".join(f"{term}:*" for term in terms)
+            return (
+                f"FROM {self.table} WHERE search_vector @@ to_tsquery('simple', %s)",
+                "id",
+                "ts_rank(search_vector, to_tsquery('simple', %s)) DESC, id DESC",
+                [query, query],
+            )
+        raise NotImplementedError(f"Full-text search is not available on {connection.vendor}")
+
+    def count(self, terms):
+        where, _, _, params = self.match_sql(terms)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) {where}", params[:1])
+            return cursor.fetchone()[0]
+
+    def ranked_ids(self, terms, limit, offset=0):
+        where, pk, ranking, params = self.match_sql(terms)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT {pk} {where} ORDER BY {ranking} LIMIT %s OFFSET %s", [*params, limit, offset])
+            return [row[0] for row in cursor.fetchall()]
+
+    def search(self, query, queryset):
+        return SearchResults(self, search_terms(query), queryset)
+
+
+class SearchResults:
+    """
+    Lazily ranked matches for Paginator: slicing fetches one page of ids from the index
+    and loads those rows from queryset, which may narrow the loaded fields but not the rows.
+    """
+
+    def __init__(self, index, terms, queryset):
+        self.index = index
+        self.terms = terms
+        self.queryset = queryset
+        self._count = None
+
+    def count(self):
+        if self._count is None:
+            self._count = self.index.count(self.terms) if self.terms else 0
+        return self._count
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, page):
+        if not isinstance(page, slice) or not self.terms:
+            return []
+        ids = self.index.ranked_ids(self.terms, page.stop - page.start, page.start)
+        found = self.queryset.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+
+class CreateSearchIndex(Operation):
+    reversible = True
+
+    def __init__(self, index):
+        self.index = index
+
+    def state_forwards(self, app_label, state):
+        pass
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        for statement in self.index.create_sql(schema_editor.connection.vendor):
+            schema_editor.execute(statement, params=None)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        for statement in self.index.drop_sql(schema_editor.connection.vendor):
+            schema_editor.execute(statement, params=None)
+
+    def describe(self):
+        return f"Create full-text search index on {self.index.table}"
+
+    def deconstruct(self):
+        return self.__class__.__name__, [self.index], {}
+
+
+order_search = SearchIndex(
+    "order_order",
+    {"name": "A", "client": "B", "contact_number": "B", "address": "C", "description": "D"},
+    digit_columns=("contact_number",),
+)
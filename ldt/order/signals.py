@@ -0,0 +1,79 @@
+from django.db import transaction
+from django.db.models import Max, Min
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from order.fragments import invalidate_board
+from order.live import publish_deleted, publish_orders
+from order.models import Order, OrderCounter, ReportJob, orders_changed
+
+REPORT_FIELDS = ('name', 'employee_id', 'price')
+
+
+@receiver(post_save, sender=Order)
+def update_order_counters_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and not {'employee', 'employee_id', 'status'} & set(update_fields):
+        return
+
+    if not hasattr(instance, 'previous_status_bucket'):
+        # saved around Order.save(), e.g. by loaddata, so the previous row was not read
+        OrderCounter.objects.rebuild()
+    elif instance.previous_status_bucket != instance.status_bucket:
+        OrderCounter.objects.shift(instance.previous_status_bucket, instance.status_bucket)
+
+
+@receiver(orders_changed, sender=Order)
+def update_order_counters_on_change(sender, shifts, **kwargs):
+    if shifts is None:
+        OrderCounter.objects.rebuild()
+    else:
+        OrderCounter.objects.shift_many(shifts)
+
+
+@receiver(post_delete, sender=Order)
+def update_order_counters_on_delete(sender, instance, **kwargs):
+    OrderCounter.objects.shift(getattr(instance, 'previous_status_bucket', instance.status_bucket), None)
+
+
+@receiver(post_save, sender=Order)
+def invalidate_reports_on_save(sender, instance, created, **kwargs):
+    loaded = getattr(instance, '_loaded_values', {})
+    if created or any(loaded.get(field) != getattr(instance, field) for field in REPORT_FIELDS):
+        ReportJob.objects.invalidate(instance.creation_time)
+
+
+@receiver(post_delete, sender=Order)
+def invalidate_reports_on_delete(sender, instance, **kwargs):
+    ReportJob.objects.invalidate(instance.creation_time)
+
+
+@receiver(orders_changed, sender=Order)
+def invalidate_reports_on_change(sender, pks, fields, deleted=False, period=None, **kwargs):
+    if deleted:
+        ReportJob.objects.invalidate(*period)
+    elif set(fields) & set(REPORT_FIELDS):
+        period = Order.objects.filter(pk__in=pks).aggregate(first=Min('creation_time'), last=Max('creation_time'))
+        ReportJob.objects.invalidate(period['first'], period['last'])
+
+
+@receiver(post_save, sender=Order)
+def publish_order_on_save(sender, instance, **kwargs):
+    transaction.on_commit(lambda: publish_orders([instance.pk]))
+
+
+@receiver(orders_changed, sender=Order)
+def publish_orders_on_change(sender, pks, deleted=False, **kwargs):
+    transaction.on_commit(lambda: publish_deleted(pks) if deleted else publish_orders(pks))
+
+
+@receiver(post_delete, sender=Order)
+def publish_order_on_delete(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: publish_deleted([pk]))
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(orders_changed, sender=Order)
+def invalidate_board_on_change(sender, **kwargs):
+    transaction.on_commit(invalidate_board)
@@ -0,0 +1,223 @@
+from contextlib import contextmanager
+
+from django.core.cache import caches
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ldt.testing import STATIC_STORAGES
+from order.models import Order, OrderCounter, ReportJob
+from order.pagination import PAGE_SIZE, encode_cursor
+from users.models import User
+
+# orders per column: a single card, and more than a page
+DATASET_SIZES = (1, PAGE_SIZE + 1)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class BoardQueriesTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff@example.com", "password", is_staff=True)
+        cls.courier = User.objects.create_user("courier@example.com", "password")
+
+    @contextmanager
+    def dataset(self, size, user):
+        # the query counts must not depend on the number of orders
+        with self.subTest(orders=size), transaction.atomic():
+            Order.objects.bulk_create(
+                Order(
+                    status=status,
+                    employee=employee,
+                    name=f"Заказ {index}",
+                    client="Клиент",
+                    contact_number="+7 912 345-67-89",
+                    payment_method="оплачено",
+                    address="Москва",
+                    description="Описание заказа",
+                )
+                for employee, status in ((None, False), (self.courier, False), (self.courier, True))
+                for index in range(size)
+            )
+            OrderCounter.objects.rebuild()
+            for cache in caches.all():
+                cache.clear()
+            self.client.force_login(user)
+            yield
+            transaction.set_rollback(True)
+
+    def test_orders_list(self):
+        for size in DATASET_SIZES:
+            with self.dataset(size, self.staff):
+                # the user, the version, the couriers and the first page of each column
+                with self.assertNumQueries(7):
+                    self.assertEqual(self.client.get(reverse("order:orders_list")).status_code, 200)
+                # the columns come from the board cache
+                with self.assertNumQueries(3):
+                    self.assertEqual(self.client.get(reverse("order:orders_list")).status_code, 200)
+
+    def test_orders_column(self):
+        url = reverse("order:orders_column", args=["assigned"])
+        for size in DATASET_SIZES:
+            with self.dataset(size, self.staff):
+                with self.assertNumQueries(2):
+                    page = self.client.get(url).json()
+                with self.assertNumQueries(0):
+                    self.assertEqual(self.client.get(url).json(), page)
+                cursor = encode_cursor(Order.objects.orders_with_employee_false_status().first())
+                with self.assertNumQueries(1):
+                    self.assertEqual(self.client.get(url, {"cursor": cursor}).status_code, 200)
+
+    def test_orders_my(self):
+        for size in DATASET_SIZES:
+            with self.dataset(size, self.courier):
+                # the user, the version and the two columns
+                with self.assertNumQueries(5):
+                    self.assertEqual(self.client.get(reverse("order:orders_my")).status_code, 200)
+                with self.assertNumQueries(4):
+                    self.assertEqual(self.client.get(reverse("order:orders_my")).status_code, 200)
+
+    def test_order_details(self):
+        for size in DATASET_SIZES:
+            with self.dataset(size, self.staff):
+                url = reverse("order:orders_details", args=[Order.objects.filter(employee=self.courier).first().pk])
+                with self.assertNumQueries(2):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+                with self.assertNumQueries(1):
+                    self.assertEqual(self.client.get(url).status_code, 200)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class ExportAccessTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = User.objects.create_user("staff@example.com", "password", is_staff=True)
+        cls.courier = User.objects.create_user("courier@example.com", "password")
+
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+
+    def test_anonymous_is_sent_to_login(self):
+        response = self.client.post(reverse("order:orders_export"), {"range": "day", "format": "csv"})
+        self.assertEqual(response.status_code, 302)
+        self.assertIn("login", response.url)
+
+    def test_courier_cannot_download_orders(self):
+        self.client.force_login(self.courier)
+        self.assertEqual(self.client.get(reverse("order:orders_export")).status_code, 403)
+        for export_format in ("csv", "xlsx"):
+            response = self.client.post(reverse("order:orders_export"), {"range": "day", "format": export_format})
+            self.assertEqual(response.status_code, 403)
+
+    def test_staff_downloads_csv(self):
+        self.client.force_login(self.staff)
+        response = self.client.post(reverse("order:orders_export"), {"range": "day", "format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+
+    def test_courier_cannot_enqueue_reports(self):
+        self.client.force_login(self.courier)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse("order:orders_export"), {"range": "day", "format": "pdf"})
+        self.assertEqual(response.status_code, 403)
+        self.assertFalse(ReportJob.objects.exists())
+        self.assertEqual(callbacks, [])
+
+    @override_settings(ORDER_REPORT_WORKER="thread")
+    def test_staff_enqueues_report(self):
+        self.client.force_login(self.staff)
+        with self.captureOnCommitCallbacks() as callbacks:
+            response = self.client.post(reverse("order:orders_export"), {"range": "day", "format": "pdf"})
+        job = ReportJob.objects.get()
+        self.assertRedirects(
+            response, reverse("order:orders_export_status", kwargs={"pk": job.pk}), fetch_redirect_response=False,
+        )
+        self.assertEqual(job.status, ReportJob.PENDING)
+        self.assertEqual(len(callbacks), 1)
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class OrderCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.first = User.objects.create_user("first@example.com", "password")
+        cls.second = User.objects.create_user("second@example.com", "password")
+
+    def create_order(self, status=False, **fields):
+        return Order.objects.create(
+            status=status,
+            name="Заказ",
+            client="Клиент",
+            contact_number="+7 912 345-67-89",
+            payment_method="оплачено",
+            address="Москва",
+            description="Описание заказа",
+            **fields,
+        )
+
+    def assertCountersMatch(self):
+        for employee in (None, self.first, self.second):
+            self.assertEqual(OrderCounter.objects.stats(employee), Order.objects.stats(employee))
+
+    def test_counters_follow_edits(self):
+        order = self.create_order()
+        self.create_order(employee=self.first)
+        self.assertCountersMatch()
+
+        # two copies of the same order, each saved from what it loaded
+        stale = Order.objects.get(pk=order.pk)
+        order.employee = self.first
+        order.save()
+        stale.employee = self.second
+        stale.save()
+        self.assertCountersMatch()
+
+        stale.status = True
+        stale.save(update_fields=["status"])
+        order.refresh_from_db()
+        self.assertTrue(order.status)
+        order.employee = self.first
+        order.save()
+        self.assertCountersMatch()
+
+        order.refresh_from_db(fields=["status"])
+        order.status = False
+        order.save()
+        self.assertCountersMatch()
+
+        stale.delete()
+        order.delete()
+        self.assertCountersMatch()
+
+    def test_counters_follow_bulk_actions(self):
+        orders = [self.create_order() for _ in range(4)]
+        pks = [order.pk for order in orders]
+
+        Order.objects.bulk_assign(pks[:3], self.first)
+        self.assertCountersMatch()
+        Order.objects.bulk_assign(pks, self.second)
+        self.assertCountersMatch()
+        Order.objects.bulk_set_status(pks[1:], True)
+        Order.objects.set_status(pks[0], True)
+        self.assertCountersMatch()
+
+        # an instance loaded before the bulk actions
+        orders[0].status = False
+        orders[0].save()
+        self.assertCountersMatch()
+
+        self.assertEqual(Order.objects.bulk_delete(pks[2:]), 2)
+        self.assertFalse(Order.objects.filter(pk__in=pks[2:]).exists())
+        orders[2].delete()
+        self.assertCountersMatch()
+
+    def test_set_status_does_not_read_the_order(self):
+        order = self.create_order(employee=self.first, status=True)
+        OrderCounter.objects.rebuild()
+        # the savepoint, the UPDATE ... RETURNING and the courier's and the total counters of both buckets
+        with self.assertNumQueries(7):
+            self.assertTrue(Order.objects.set_status(order.pk, False))
+        with self.assertNumQueries(3):
+            self.assertFalse(Order.objects.set_status(order.pk, False))
+        self.assertCountersMatch()
@@ -4,12 +4,20 @@ from order import views
 app_name = "order"
 urlpatterns = [
     path("list", views.OrdersList.as_view(), name="orders_list"),
+    path("list/<str:column>", views.OrdersColumn.as_view(), name="orders_column"),
+    path("bulk", views.OrdersBulkAction.as_view(), name="orders_bulk"),
+    path("cache-stats", views.BoardCacheStats.as_view(), name="orders_cache_stats"),
+    path("search", views.OrdersSearch.as_view(), name="orders_search"),
+    path("events", views.OrdersEvents.as_view(), name="orders_events"),
     path("details/<int:pk>", views.OrderDetails.as_view(), name="orders_details"),
     path("edit/<int:pk>", views.OrderEdit.as_view(), name="orders_edit"),
     path('delete/<int:pk>', views.OrderDeleteView.as_view(), name='order_delete'),
     path("complete/<int:pk>", views.OrderComplete.as_view(), name="orders_complete"),
     path("cancel/<int:pk>", views.OrderСancel.as_view(), name="orders_cancel"),
     path("create", views.OrderCreate.as_view(), name="orders_create"),
+    path("import", views.OrderImport.as_view(), name="orders_import"),
     path("export", views.ExportData.as_view(), name="orders_export"),
+    path("export/<int:pk>", views.ExportStatus.as_view(), name="orders_export_status"),
+    path("export/<int:pk>/download", views.ExportDownload.as_view(), name="orders_export_download"),
     path("my", views.OrdersListMy.as_view(), name="orders_my"),
 ]
@@ -1,69 +1,183 @@
-import os
-from datetime import datetime, timedelta
-
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import HttpResponse
-from django.shortcuts import render, get_object_or_404, redirect
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.http import HttpResponse, HttpResponseBadRequest, JsonResponse, Http404, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404, render, get_object_or_404, redirect
 from django.urls import reverse, reverse_lazy
+from django.utils.http import urlencode
+from django.utils.safestring import mark_safe
 from django.views import View
 from django.views.generic import TemplateView, FormView, UpdateView, DeleteView
+from order.conditional import not_modified, page_etag, set_validators
+from order.exports import csv_response, file_response, xlsx_available, xlsx_response
 from order.forms import CreateOrderForm
-from order.models import Order
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
-from reportlab.platypus import Table, TableStyle, SimpleDocTemplate, Paragraph
+from order.fragments import (
+    EMPLOYEE_CARD_TEMPLATE, acolumn_fragment, arender_cards, arender_column, cache_stats, column_fragment,
+)
+from order.imports import import_orders, read_rows
+from order.jobs import schedule_pending_jobs
+from order.live import event_stream
+from order.models import Order, ReportJob
+from order.pagination import aget_page, akeyset_page
+from order.search import SEARCH_PAGE_SIZE, order_search
+from users.mixins import AsyncUserPassesTestMixin
 from users.models import User
-from order.forms import EditOrderForm
+from order.forms import BulkActionForm, EditOrderForm, ExportForm, ImportOrdersForm
+
+
+class OrderColumnsMixin:
+    columns = {
+        "not_assigned": "orders_without_employee",
+        "assigned": "orders_with_employee_false_status",
+        "done": "orders_with_status_true",
+    }
 
+    def get_column_queryset(self, column):
+        return getattr(Order.objects, self.columns[column])()
 
-class OrdersList(UserPassesTestMixin, View):
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+
+class OrdersList(OrderColumnsMixin, AsyncUserPassesTestMixin, View):
     template_name = "order/orders_list.html"
 
+    async def get(self, request):
+        version = await Order.objects.aversion()
+        couriers = User.objects.filter(is_staff=False).only("email", "first_name", "last_name", "middle_name")
+        couriers = [courier async for courier in couriers.aiterator()]
+        etag = page_etag(request, version, [(courier.pk, str(courier)) for courier in couriers])
+        # deletions and courier changes leave the latest updated_at behind, so only the ETag is checked
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        context = {}
+        for column in self.columns:
+            fragment = await acolumn_fragment(column, self.get_column_queryset(column))
+            context[column] = mark_safe(fragment["html"])
+            context[f"{column}_next"] = fragment["next"]
+        context["couriers"] = couriers
+        context["bulk_actions"] = BulkActionForm.ACTION_CHOICES
+        return set_validators(render(request, self.template_name, context), etag, version["last_modified"])
+
+
+class OrdersColumn(OrderColumnsMixin, AsyncUserPassesTestMixin, View):
+    async def get(self, request, column):
+        if column not in self.columns:
+            raise Http404
+
+        cursor = request.GET.get("cursor")
+        if not cursor:
+            return JsonResponse(await acolumn_fragment(column, self.get_column_queryset(column)))
+
+        try:
+            orders, next_cursor = await akeyset_page(self.get_column_queryset(column), cursor)
+        except ValueError:
+            return HttpResponseBadRequest()
+
+        return JsonResponse({
+            "html": await arender_column(orders, show_empty=False),
+            "next": next_cursor,
+        })
+
+
+class OrdersBulkAction(OrderColumnsMixin, UserPassesTestMixin, View):
+    def post(self, request):
+        form = BulkActionForm(request.POST)
+        if not form.is_valid():
+            return JsonResponse({"errors": [error for errors in form.errors.values() for error in errors]}, status=400)
+
+        changed = form.apply()
+
+        columns = {column: column_fragment(column, self.get_column_queryset(column)) for column in self.columns}
+        return JsonResponse({"changed": changed, "columns": columns})
+
+
+class BoardCacheStats(UserPassesTestMixin, View):
     def get(self, request):
-        not_assigned = Order.objects.orders_without_employee
-        assigned = Order.objects.orders_with_employee_false_status
-        done = Order.objects.orders_with_status_true
+        return JsonResponse(cache_stats())
+
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+
+class OrdersSearch(AsyncUserPassesTestMixin, View):
+    template_name = "order/orders_search.html"
+
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
+
+    async def get(self, request):
+        query = request.GET.get("q", "").strip()
+        paginator = Paginator(order_search.search(query, Order.objects.for_board()), SEARCH_PAGE_SIZE)
+        page = await aget_page(paginator, request.GET.get("page"))
 
         context = {
-            "not_assigned": not_assigned,
-            "assigned": assigned,
-            "done": done,
+            "query": query,
+            "page": page,
+            "cards": await arender_cards(page.object_list, EMPLOYEE_CARD_TEMPLATE),
+            "params": f"{urlencode({'q': query})}&",
         }
         return render(request, self.template_name, context)
 
-    def test_func(self):
-        return self.request.user.is_superuser or self.request.user.is_staff
 
+class OrdersEvents(View):
+    async def get(self, request):
+        user = await request.auser()
+        if not user.is_authenticated:
+            raise PermissionDenied
+        if not isinstance(request, ASGIRequest):
+            # a WSGI worker would be held by the stream forever; 204 stops EventSource from reconnecting
+            return HttpResponse(status=204)
+
+        response = StreamingHttpResponse(event_stream(user), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
 
-class OrdersListMy(LoginRequiredMixin, View):
+
+class OrdersListMy(AsyncUserPassesTestMixin, View):
     template_name = "order/orders_list_my.html"
     login_url = reverse_lazy("users:login")
 
-    def get(self, request):
-        assigned = Order.objects.orders_with_employee_false_status_for_employee(self.request.user)
-        done = Order.objects.orders_with_status_true_for_employee(self.request.user)
+    async def get(self, request):
+        version = await Order.objects.aversion(employee=request.user)
+        etag = page_etag(request, version)
+        # an order taken away from the courier does not move the latest updated_at, only the ETag sees it
+        response = not_modified(request, etag)
+        if response:
+            return response
+
+        assigned = Order.objects.orders_with_employee_false_status_for_employee(request.user)
+        done = Order.objects.orders_with_status_true_for_employee(request.user)
 
         context = {
-            "assigned": assigned,
-            "done": done,
+            "assigned": await arender_cards([order async for order in assigned.aiterator()], EMPLOYEE_CARD_TEMPLATE),
+            "done": await arender_cards([order async for order in done.aiterator()], EMPLOYEE_CARD_TEMPLATE),
         }
-        return render(request, self.template_name, context)
+        return set_validators(render(request, self.template_name, context), etag, version["last_modified"])
 
 
-class OrderDetails(LoginRequiredMixin, View):
+class OrderDetails(AsyncUserPassesTestMixin, View):
     template_name = "order/order_details.html"
 
-    def get(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
+    async def get(self, request, pk):
+        order = await aget_object_or_404(Order.objects.select_related("employee"), pk=pk)
+        employee = order.employee
+        etag = page_etag(request, order.updated_at, employee and (
+            employee.pk, employee.get_name(), employee.avatar_thumb_url, employee.is_staff, employee.is_superuser,
+        ))
+        response = not_modified(request, etag)
+        if response:
+            return response
+
         context = {
             "order": order,
         }
-        return render(request, self.template_name, context)
+        return set_validators(render(request, self.template_name, context), etag, order.updated_at)
 
 
 class OrderCreate(UserPassesTestMixin, FormView):
@@ -84,7 +198,7 @@ class OrderCreate(UserPassesTestMixin, FormView):
 
         delivery_date = data["delivery_date"] if data["delivery_date"] else None
 
-        order = Order.objects.create(
+        Order.objects.create(
             status=False,
             name=data["name"],
             address=data["address"],
@@ -95,7 +209,6 @@ class OrderCreate(UserPassesTestMixin, FormView):
             description=data["description"],
             delivery_date=delivery_date
         )
-        order.save()
 
         self.success_url = reverse(
             "order:orders_list",
@@ -155,10 +268,8 @@ class OrderEdit(UserPassesTestMixin, UpdateView):
 
 class OrderComplete(LoginRequiredMixin, View):
     def get(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
-
-        order.status = True
-        order.save()
+        if not Order.objects.set_status(pk, True) and not Order.objects.filter(pk=pk).exists():
+            raise Http404
 
         if self.request.user.is_staff:
             return redirect(reverse(
@@ -172,10 +283,8 @@ class OrderComplete(LoginRequiredMixin, View):
 
 class OrderСancel(LoginRequiredMixin, View):
     def get(self, request, pk):
-        order = get_object_or_404(Order, pk=pk)
-
-        order.status = False
-        order.save()
+        if not Order.objects.set_status(pk, False) and not Order.objects.filter(pk=pk).exists():
+            raise Http404
 
         if self.request.user.is_staff:
             return redirect(reverse(
@@ -204,85 +313,99 @@ class OrderDeleteView(DeleteView):
         ))
 
 
-class ExportData(TemplateView):
+class OrderImport(UserPassesTestMixin, FormView):
+    form_class = ImportOrdersForm
+    template_name = "order/order_import.html"
+    errors_shown = 100
+
+    def form_valid(self, form):
+        file = form.cleaned_data["file"]
+        try:
+            result = import_orders(read_rows(file, form.get_format(file)))
+        except ValueError as error:
+            messages.error(self.request, f"Не удалось прочитать файл: {error}")
+            return self.render_to_response(self.get_context_data(form=form))
+
+        return self.render_to_response(self.get_context_data(
+            form=self.form_class(),
+            result=result,
+            errors=result.errors[:self.errors_shown],
+        ))
+
+    def test_func(self):
+        if self.request.user.is_superuser or self.request.user.is_staff:
+            return True
+        return False
+
+
+class ExportData(UserPassesTestMixin, TemplateView):
     template_name = "order/export_data.html"
 
     def get(self, request, *args, **kwargs):
-        return render(request, self.template_name)
+        return render(request, self.template_name, {"form": ExportForm(), "xlsx_available": xlsx_available()})
 
     def post(self, request, *args, **kwargs):
-        data_range = request.POST.get("range")
-
-        if data_range == "mounth":
-            orders = Order.objects.orders_created_this_month()
-        else:
-            orders = Order.objects.orders_created_today()
-
-        response = HttpResponse(content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="Report  ({" - ".join(get_month_boundaries()) if data_range == "month" else datetime.now().strftime("%d.%m.%y")}).pdf"'
-
-        doc = SimpleDocTemplate(response, pagesize=A4)
-        elements = []
-        pdfmetrics.registerFont(TTFont('Roboto-Black', 'order/fonts/Roboto-Black.ttf'))
-        title_style = ParagraphStyle(
-            "Title",
-            fontName="Roboto-Black",
-            fontSize=18,
-            textColor=colors.black,
-            alignment=1,
-            spaceAfter=12
-        )
-        title = Paragraph("Отчет", title_style)
-
-        subtitle_style = ParagraphStyle(
-            "Subtitle",
-            fontName="Roboto-Black",
-            fontSize=14,
-            textColor=colors.black,
-            alignment=1,
-            spaceAfter=12
-        )
-
-        if data_range == "day":
-            subtitle = Paragraph(f"Отчет по заказам за {datetime.now().strftime('%d.%m.%y')}", subtitle_style)
-        else:
-            subtitle = Paragraph(f"Отчет по заказам с {' по '.join(get_month_boundaries())}", subtitle_style)
+        form = ExportForm(request.POST)
+        if not form.is_valid():
+            for error in form.non_field_errors():
+                messages.error(request, error)
+            return redirect(reverse("order:orders_export"))
+
+        data_range = form.cleaned_data["range"]
+        export_format = form.cleaned_data["format"]
+        period_start, period_end = form.get_period()
+        if export_format != "pdf":
+            if export_format == "xlsx" and not xlsx_available():
+                messages.error(request, "Выгрузка в XLSX недоступна")
+                return redirect(reverse("order:orders_export"))
+
+            orders = Order.objects.orders_created_between(period_start, period_end)
+            basename = ReportJob(data_range=data_range, period_start=period_start, period_end=period_end).basename
+            asynchronous = isinstance(request, ASGIRequest)
+            if export_format == "csv":
+                return csv_response(orders, basename, asynchronous)
+            return xlsx_response(orders, basename, asynchronous)
+
+        job = ReportJob.objects.enqueue(data_range, period_start, period_end)
+        if job.status == ReportJob.DONE:
+            return redirect(reverse(
+                "order:orders_export_download",
+                kwargs={"pk": job.pk},
+            ))
 
-        elements.append(title)
-        elements.append(subtitle)
+        schedule_pending_jobs()
+        return redirect(reverse(
+            "order:orders_export_status",
+            kwargs={"pk": job.pk},
+        ))
 
-        data = [
-            ['№', 'Название', "Исполнитель", 'Дата', 'Время', "Цена"],
-        ]
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
 
-        for order in orders:
-            data.append((order.id, order.name, order.employee, order.creation_time.strftime("%d-%m-%Y"),
-                         order.creation_time.strftime("%H:%M"), order.price))
 
-        table_style = TableStyle([
-            ('FONTNAME', (0, 0), (-1, -1), 'Roboto-Black'),
-            ('BACKGROUND', (0, 0), (-1, 0), colors.white),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Roboto-Black'),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-        ])
+class ExportStatus(UserPassesTestMixin, View):
+    template_name = "order/export_status.html"
 
-        table = Table(data)
-        table.setStyle(table_style)
-        elements.append(table)
+    def get(self, request, pk):
+        job = get_object_or_404(ReportJob, pk=pk)
+        if not request.accepts("text/html"):
+            return JsonResponse({
+                "id": job.pk,
+                "status": job.status,
+                "download_url": reverse("order:orders_export_download", kwargs={"pk": job.pk})
+                if job.status == ReportJob.DONE else None,
+            })
+        return render(request, self.template_name, {"job": job})
 
-        doc.build(elements)
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
 
-        return response
 
+class ExportDownload(UserPassesTestMixin, View):
+    def get(self, request, pk):
+        job = get_object_or_404(ReportJob, pk=pk, status=ReportJob.DONE)
+        job.touch()
+        return file_response(job.file.open("rb"), job.filename, asynchronous=isinstance(request, ASGIRequest))
 
-def get_month_boundaries():
-    current_date = datetime.now()
-    first_day_of_month = current_date.replace(day=1)
-    last_day_of_month = first_day_of_month.replace(month=first_day_of_month.month % 12 + 1) - timedelta(days=1)
-    first_day_formatted = first_day_of_month.strftime("%d-%m-%Y")
-    last_day_formatted = last_day_of_month.strftime("%d-%m-%Y")
-    return first_day_formatted, last_day_formatted
+    def test_func(self):
+        return self.request.user.is_superuser or self.request.user.is_staff
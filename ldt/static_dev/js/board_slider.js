@@ -0,0 +1,47 @@
+// Lets the mouse drag the columns of a board sideways; touch screens scroll the track natively.
+function mountBoardSlider(track) {
+    var drag = null;
+
+    track.addEventListener("pointerdown", function (event) {
+        if (event.pointerType !== "mouse" || event.button !== 0 || event.target.closest("a, button, input, select, textarea")) {
+            return;
+        }
+        drag = {x: event.clientX, scrollLeft: track.scrollLeft, moved: false};
+    });
+
+    track.addEventListener("pointermove", function (event) {
+        if (!drag) {
+            return;
+        }
+        var distance = event.clientX - drag.x;
+        if (!drag.moved && Math.abs(distance) < 5) {
+            return;
+        }
+        if (!drag.moved) {
+            drag.moved = true;
+            track.classList.add("is-dragging");
+            track.setPointerCapture(event.pointerId);
+        }
+        track.scrollLeft = drag.scrollLeft - distance;
+    });
+
+    function stop(event) {
+        if (!drag) {
+            return;
+        }
+        var moved = drag.moved;
+        drag = null;
+        track.classList.remove("is-dragging");
+        if (moved && event.type === "pointerup") {
+            // the cards open on click, which must not happen at the end of a drag
+            track.addEventListener("click", function (click) {
+                click.preventDefault();
+                click.stopPropagation();
+            }, {capture: true, once: true});
+        }
+    }
+
+    track.addEventListener("pointerup", stop);
+    track.addEventListener("pointercancel", stop);
+    return track;
+}
@@ -0,0 +1,46 @@
+// Applies the order events pushed by /order/events to the columns of a board.
+function connectLiveBoard(url, onReload) {
+    var source = new EventSource(url);
+    source.onmessage = function (message) {
+        var event = JSON.parse(message.data);
+        if (event.type === "reload") {
+            onReload();
+            return;
+        }
+
+        var card = document.querySelector('.order[data-order="' + event.id + '"]');
+        if (card) {
+            card.remove();
+        }
+        if (event.type === "order") {
+            var column = document.querySelector('.order-column[data-column="' + event.column + '"]');
+            if (column) {
+                insertOrderCard(column, event);
+            }
+        }
+    };
+    return source;
+}
+
+function insertOrderCard(column, event) {
+    var template = document.createElement("template");
+    template.innerHTML = event.html.trim();
+    var card = template.content.firstElementChild;
+
+    var cards = column.querySelectorAll(".order");
+    for (var i = 0; i < cards.length; i++) {
+        var created = Number(cards[i].dataset.created);
+        if (created < event.created || (created === event.created && Number(cards[i].dataset.order) < event.id)) {
+            column.insertBefore(card, cards[i]);
+            return;
+        }
+    }
+    // older than every loaded card: it will arrive with the next page unless this is the last one
+    if (!column.dataset.next) {
+        var empty = column.querySelector(".order-column-empty");
+        if (empty) {
+            empty.remove();
+        }
+        column.insertBefore(card, column.querySelector(".order-column-end"));
+    }
+}
@@ -1,7 +1,14 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
-    verbose_name = "Пользователи"
\ No newline at end of file
+    verbose_name = "Пользователи"
+
+    def ready(self):
+        from users import signals  # noqa: F401
+        from users.search import user_search
+
+        post_migrate.connect(user_search.restore, sender=self)
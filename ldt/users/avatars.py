@@ -0,0 +1,39 @@
+from io import BytesIO
+from pathlib import PurePath
+
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+AVATAR_MAX_SIZE = 1024
+AVATAR_THUMB_SIZE = 128
+AVATAR_QUALITY = 85
+AVATAR_PLACEHOLDER = "img/avatar.svg"
+AVATAR_FORMAT, AVATAR_EXTENSION = ("WEBP", "webp") if features.check("webp") else ("JPEG", "jpg")
+
+
+def encode_image(image):
+    keep_alpha = AVATAR_FORMAT == "WEBP" and ("A" in image.getbands() or "transparency" in image.info)
+    image = image.convert("RGBA" if keep_alpha else "RGB")
+    buffer = BytesIO()
+    # encoders only write the EXIF and ICC data passed to save(), so none of the upload's metadata survives
+    image.save(buffer, AVATAR_FORMAT, quality=AVATAR_QUALITY)
+    return ContentFile(buffer.getvalue())
+
+
+def process_avatar(file):
+    file.seek(0)
+    with Image.open(file) as image:
+        # JPEG decoders can skip straight to a smaller scale, phones upload 12 MP photos
+        image.draft("RGB", (AVATAR_MAX_SIZE, AVATAR_MAX_SIZE))
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail((AVATAR_MAX_SIZE, AVATAR_MAX_SIZE))
+        thumbnail = ImageOps.fit(image, (AVATAR_THUMB_SIZE, AVATAR_THUMB_SIZE))
+        return encode_image(image), encode_image(thumbnail)
+
+
+def apply_avatar(user, file):
+    # replaces the avatar with the capped image and generates the thumbnail, the caller saves the user
+    avatar, thumbnail = process_avatar(file)
+    name = f"{PurePath(user.avatar.name).stem}.{AVATAR_EXTENSION}"
+    user.avatar.save(name, avatar, save=False)
+    user.avatar_thumb.save(name, thumbnail, save=False)
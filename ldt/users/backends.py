@@ -1,37 +1,44 @@
+import uuid
+
 import django.contrib.auth.models
 import django.template.loader
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
-from users.models import User
+from django.core.cache import cache
 
 usermodel = django.contrib.auth.get_user_model()
 
 
+def user_cache_version_key(user_id):
+    return f"users:user:{user_id}:version"
+
+
+def user_cache_key(user_id):
+    # the row is cached under a random version of the user rather than under the id alone: forget_user()
+    # drops the version, so a copy that a concurrent request read before a save and stores after it
+    # is never found again
+    version = cache.get_or_set(user_cache_version_key(user_id), uuid.uuid4().hex, None)
+    return f"users:user:{user_id}:{version}"
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_version_key(user_id))
+
+
 class EmailAuthBackend(ModelBackend):
-    def authenticate(self, request, username=None, password=None, **kwargs):
-        if username is None:
-            username = kwargs.get(usermodel.USERNAME_FIELD)
-        if username is None or password is None:
-            return None
-        try:
-            if "@" in username:
-                user = User.objects.by_mail(
-                    email=username,
-                )
-            else:
-                user = usermodel._default_manager.get_by_natural_key(username)
-        except User.DoesNotExist:
-            usermodel().set_password(password)
-        else:
-            if user:
-                if user.check_password(password):
-                    user.save()
-                    return user
+    # email is the USERNAME_FIELD, so ModelBackend.authenticate() finds the user with one lookup
+    # by its unique index, and check_password() saves just the password when its hash is outdated
 
     def get_user(self, user_id):
-        try:
-            user = usermodel._default_manager.get(pk=user_id)
-        except usermodel.DoesNotExist:
-            return None
+        # every authenticated request resolves the user, the row is cached until User.save()
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = usermodel._default_manager.get(pk=user_id)
+            except usermodel.DoesNotExist:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
         return user if self.user_can_authenticate(user) else None
 
 
@@ -0,0 +1,72 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import UnidentifiedImageError
+
+from users.avatars import apply_avatar
+from users.backends import forget_user
+from users.models import User
+
+# files younger than this may belong to an upload whose transaction has not committed yet
+AVATAR_STALE_AGE = timedelta(hours=1)
+
+executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="avatar-worker")
+
+
+def process_user_avatar(user):
+    source = user.avatar.name
+    try:
+        with user.avatar.open("rb") as file:
+            apply_avatar(user, file)
+    except (OSError, UnidentifiedImageError):
+        # the upload is kept as it is rather than leaving the user without a photo
+        User.objects.filter(pk=user.pk, avatar=source).update(avatar_processing=False)
+        forget_user(user.pk)
+        return False
+
+    # a newer upload wins; either way the files nobody refers to are left to delete_stale_avatars(),
+    # since a request still holding the old row may save the upload back
+    updated = User.objects.filter(pk=user.pk, avatar=source).update(
+        avatar=user.avatar.name,
+        avatar_thumb=user.avatar_thumb.name,
+        avatar_processing=False,
+    )
+    forget_user(user.pk)
+    return bool(updated)
+
+
+def delete_stale_avatars(min_age=AVATAR_STALE_AGE):
+    referenced = {name for names in User.objects.values_list("avatar", "avatar_thumb") for name in names if name}
+    cutoff = timezone.now() - min_age
+    deleted = 0
+
+    for field in (User._meta.get_field("avatar"), User._meta.get_field("avatar_thumb")):
+        storage, directory = field.storage, field.upload_to
+        try:
+            _, files = storage.listdir(directory)
+        except FileNotFoundError:
+            continue
+        for file in files:
+            name = str(PurePosixPath(directory, file))
+            if name not in referenced and storage.get_modified_time(name) < cutoff:
+                storage.delete(name)
+                deleted += 1
+    return deleted
+
+
+def run_pending_avatars():
+    try:
+        for user in list(User.objects.filter(avatar_processing=True).only("avatar", "avatar_thumb")):
+            process_user_avatar(user)
+        delete_stale_avatars()
+    finally:
+        close_old_connections()
+
+
+def schedule_pending_avatars():
+    if settings.USER_AVATAR_WORKER == "thread":
+        transaction.on_commit(lambda: executor.submit(run_pending_avatars))
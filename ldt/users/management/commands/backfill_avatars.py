@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from users.jobs import delete_stale_avatars, process_user_avatar
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Caps the size of avatars uploaded before thumbnails were generated, strips their "
+        "metadata, creates the missing thumbnails and deletes the replaced files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--all", action="store_true", help="Process avatars that already have a thumbnail too.")
+
+    def handle(self, *args, **options):
+        users = User.objects.exclude(avatar="").only("avatar", "avatar_thumb")
+        if not options["all"]:
+            users = users.filter(avatar_thumb="")
+
+        processed = failed = 0
+        for user in list(users):
+            if process_user_avatar(user):
+                processed += 1
+            else:
+                failed += 1
+                self.stderr.write(f"Не удалось обработать {user.avatar.name}")
+
+        deleted = delete_stale_avatars()
+        self.stdout.write(self.style.SUCCESS(
+            f"Обработано фото: {processed}, с ошибками: {failed}, удалено старых файлов: {deleted}"
+        ))
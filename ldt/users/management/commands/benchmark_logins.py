@@ -0,0 +1,72 @@
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import update_last_login
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+
+from users.models import User
+
+BENCHMARK_PASSWORD = "benchmark-password"
+
+
+class Command(BaseCommand):
+    help = (
+        "Logs seeded users in concurrently the way LoginView does (authenticate() and the "
+        "last_login update) and prints logins per second and the queries of one login. "
+        "The seeded users are deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--logins", type=int, default=400)
+        parser.add_argument("--concurrency", type=int, default=8)
+
+    def handle(self, *args, **options):
+        # one hash for everybody, hashing each seeded password would take longer than the benchmark
+        password = make_password(BENCHMARK_PASSWORD)
+        users = User.objects.bulk_create(
+            User(email=f"login-{index}@seed.local", password=password, first_name="Курьер", last_name=str(index))
+            for index in range(options["users"])
+        )
+        emails = [user.email for user in users]
+        try:
+            with CaptureQueriesContext(connection) as queries:
+                self.login(emails[0])
+            self.stdout.write(f"Запросов на один вход: {len(queries)}")
+            for query in queries:
+                self.stdout.write(f"  {query['sql']}")
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as executor:
+                latencies = list(executor.map(
+                    self.measure, (emails[index % len(emails)] for index in range(options["logins"])),
+                ))
+            elapsed = time.perf_counter() - started
+
+            self.stdout.write(f"{options['logins'] / elapsed:.1f} входов/с при {options['concurrency']} потоках")
+            self.stdout.write(
+                f"задержка: медиана {statistics.median(latencies) * 1000:.0f} мс, "
+                f"95% {sorted(latencies)[int(len(latencies) * 0.95) - 1] * 1000:.0f} мс"
+            )
+        finally:
+            User.objects.filter(email__in=emails).delete()
+
+    def login(self, email):
+        user = authenticate(username=email, password=BENCHMARK_PASSWORD)
+        if user is None:
+            raise RuntimeError(f"Не удалось войти как {email}")
+        update_last_login(None, user)
+
+    def measure(self, email):
+        started = time.perf_counter()
+        try:
+            self.login(email)
+        finally:
+            # the end of a request closes the connection too, with the default CONN_MAX_AGE = 0
+            connections.close_all()
+        return time.perf_counter() - started
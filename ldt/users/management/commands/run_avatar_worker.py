@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from users.jobs import run_pending_avatars
+
+
+class Command(BaseCommand):
+    help = (
+        "Resizes uploaded avatars, generates their thumbnails and deletes replaced avatar files. "
+        "Runs until interrupted unless --once is given."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Process the queued avatars and exit.")
+        parser.add_argument("--interval", type=float, default=2, help="Seconds between queue polls.")
+
+    def handle(self, *args, **options):
+        while True:
+            run_pending_avatars()
+
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
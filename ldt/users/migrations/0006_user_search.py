@@ -0,0 +1,20 @@
+# Generated by Django 5.0.4 on 2026-10-18 21:10
+
+from django.db import migrations
+
+from order.search import CreateSearchIndex, SearchIndex
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0005_alter_user_avatar"),
+    ]
+
+    operations = [
+        CreateSearchIndex(
+            SearchIndex(
+                "users_user",
+                {"email": "A", "last_name": "A", "first_name": "A", "middle_name": "B"},
+            )
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0006_user_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_thumb",
+            field=models.ImageField(
+                blank=True,
+                editable=False,
+                upload_to="avatars/thumbs",
+                verbose_name="миниатюра фото",
+            ),
+        ),
+    ]
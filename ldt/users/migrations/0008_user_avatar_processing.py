@@ -0,0 +1,19 @@
+# Generated by Django 5.0.4 on 2026-10-18 20:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("users", "0007_user_avatar_thumb"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="avatar_processing",
+            field=models.BooleanField(
+                default=False, editable=False, verbose_name="фото обрабатывается"
+            ),
+        ),
+    ]
@@ -0,0 +1,15 @@
+from django.contrib.auth.mixins import AccessMixin
+
+
+class AsyncUserPassesTestMixin(AccessMixin):
+    # UserPassesTestMixin for async views: request.user is loaded with auser(),
+    # since the lazy request.user would query the database from the event loop
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if not self.test_func():
+            return self.handle_no_permission()
+        return await super().dispatch(request, *args, **kwargs)
+
+    def test_func(self):
+        return self.request.user.is_authenticated
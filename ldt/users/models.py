@@ -3,6 +3,11 @@ import sys
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.db.models import OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.templatetags.static import static
+from django_cleanup import cleanup
+from users.avatars import AVATAR_PLACEHOLDER
 
 if "makemigrations" not in sys.argv and "migrate" not in sys.argv:
     AbstractUser._meta.get_field("email")._unique = True
@@ -10,11 +15,36 @@ if "makemigrations" not in sys.argv and "migrate" not in sys.argv:
 
 class CustomUserManager(BaseUserManager):
     def by_mail(self, email):
-        return self.get_queryset().filter(email=email).first()
+        try:
+            return self.get_queryset().get(email=email)
+        except self.model.DoesNotExist:
+            return None
 
     def get_oders_count(self):
         pass
 
+    def for_list(self, role=None):
+        # the order app depends on users, so its models are imported when the list is built
+        from order.models import DONE, IN_PROGRESS, OrderCounter
+
+        def counter(bucket):
+            value = OrderCounter.objects.filter(employee=OuterRef('pk'), bucket=bucket).values('value')[:1]
+            return Coalesce(Subquery(value), 0)
+
+        users = self.only(
+            'email', 'first_name', 'last_name', 'middle_name', 'avatar', 'avatar_thumb', 'avatar_processing',
+            'is_staff', 'is_superuser',
+        ).annotate(
+            active_orders=counter(IN_PROGRESS),
+            done_orders=counter(DONE),
+        ).order_by('id')
+
+        if role == 'courier':
+            users = users.filter(is_staff=False, is_superuser=False)
+        elif role == 'admin':
+            users = users.filter(Q(is_staff=True) | Q(is_superuser=True))
+        return users
+
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
@@ -36,6 +66,8 @@ class CustomUserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
+# replaced avatars are removed by the avatar worker, not during the request that saves the user
+@cleanup.ignore
 class User(AbstractUser):
     objects = CustomUserManager()
 
@@ -58,6 +90,17 @@ class User(AbstractUser):
         upload_to='avatars',
 
     )
+    avatar_thumb = models.ImageField(
+        "миниатюра фото",
+        upload_to='avatars/thumbs',
+        blank=True,
+        editable=False,
+    )
+    avatar_processing = models.BooleanField(
+        "фото обрабатывается",
+        default=False,
+        editable=False,
+    )
     birthday = models.DateField(
         "дата рождения",
         help_text="Введите дату рождения",
@@ -88,6 +131,28 @@ class User(AbstractUser):
     def __str__(self):
         return self.get_name() + " (" + self.email + ")"
 
+    def save(self, *args, **kwargs):
+        if self.avatar and not self.avatar._committed:
+            # the upload is stored as it is, the avatar worker decodes and resizes it
+            self.avatar_thumb = ''
+            self.avatar_processing = True
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'avatar_thumb', 'avatar_processing'}
+        super().save(*args, **kwargs)
+
+    @property
+    def avatar_url(self):
+        if self.avatar_processing:
+            return static(AVATAR_PLACEHOLDER)
+        return self.avatar.url if self.avatar else ""
+
+    @property
+    def avatar_thumb_url(self):
+        # avatars uploaded before the thumbnails existed fall back to the original until backfill_avatars
+        if self.avatar_thumb:
+            return self.avatar_thumb.url
+        return self.avatar_url
+
     def get_name(self):
         name = self.email
         if self.last_name:
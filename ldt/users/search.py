@@ -0,0 +1,6 @@
+from order.search import SearchIndex
+
+user_search = SearchIndex(
+    "users_user",
+    {"email": "A", "last_name": "A", "first_name": "A", "middle_name": "B"},
+)
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from users.backends import forget_user
+from users.jobs import schedule_pending_avatars
+
+
+@receiver(post_save, sender="users.User")
+@receiver(post_delete, sender="users.User")
+def forget_cached_user(sender, instance, **kwargs):
+    # after the commit, so that the next version is only ever cached with the new row;
+    # the pk is taken now, a deleted instance has none by then
+    pk = instance.pk
+    transaction.on_commit(lambda: forget_user(pk))
+
+
+@receiver(post_save, sender="users.User")
+def schedule_avatar_processing(sender, instance, **kwargs):
+    if instance.avatar_processing:
+        schedule_pending_avatars()
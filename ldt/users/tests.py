@@ -0,0 +1,53 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ldt.testing import STATIC_STORAGES
+from users.backends import user_cache_key, user_cache_version_key
+from users.models import User
+
+
+@override_settings(STORAGES=STATIC_STORAGES)
+class UserCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            "courier@example.com", "password", first_name="Иван", last_name="Петров", avatar="avatars/courier.jpg",
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_session_and_user_are_cached(self):
+        # the homepage itself queries nothing, so only authentication can
+        with self.assertNumQueries(1):
+            self.client.get(reverse("homepage:homepage"))
+        self.assertIsNotNone(cache.get(user_cache_key(self.user.pk)))
+        with self.assertNumQueries(0):
+            self.client.get(reverse("homepage:homepage"))
+
+    def test_profile_save_forgets_cached_user_on_commit(self):
+        self.client.get(reverse("homepage:homepage"))
+        key = user_cache_key(self.user.pk)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse("users:profile"), {
+                "email": self.user.email,
+                "first_name": "Пётр",
+                "last_name": "Петров",
+                "middle_name": "",
+                "birthday": "",
+            })
+            self.assertRedirects(response, reverse("users:profile"), fetch_redirect_response=False)
+            # a concurrent request before the commit would cache the old row again
+            self.assertEqual(user_cache_key(self.user.pk), key)
+        self.assertIsNone(cache.get(user_cache_version_key(self.user.pk)))
+        # a request that read the old row before the commit stores it after
+        cache.set(key, self.user)
+
+        with self.assertNumQueries(1):
+            self.client.get(reverse("homepage:homepage"))
+        self.assertNotEqual(user_cache_key(self.user.pk), key)
+        self.assertEqual(cache.get(user_cache_key(self.user.pk)).first_name, "Пётр")
+
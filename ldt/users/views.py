@@ -1,14 +1,21 @@
 from django.contrib import messages
 from django.contrib.auth import login
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q
+from django.core.paginator import Paginator
 from django.shortcuts import redirect, render, get_object_or_404
 from django.urls import reverse_lazy
+from django.utils.http import urlencode
 from django.views import View
 from django.views.generic import CreateView, FormView
-from order.models import Order
+from order.models import OrderCounter
+from order.pagination import aget_page
+from order.search import SEARCH_PAGE_SIZE
+from users.mixins import AsyncUserPassesTestMixin
 from users.forms import SignUpForm, UserToChangeForm
 from users.models import User
+from users.search import user_search
+
+USERS_PAGE_SIZE = 30
 
 
 class UserRegistrationView(CreateView):
@@ -24,11 +31,11 @@ class UserRegistrationView(CreateView):
         return reverse_lazy("user:login")
 
     def form_valid(self, form):
-        user = form.save(commit=False)
-        user.save()
-        login(self.request, user)
+        # saved once: a second full save could overwrite the avatar the worker has processed meanwhile
+        self.object = form.save()
+        login(self.request, self.object)
 
-        return super().form_valid(form)
+        return redirect(self.get_success_url())
 
     def form_invalid(self, form):
         for field, errors in form.errors.items():
@@ -48,16 +55,11 @@ class ProfileEditView(LoginRequiredMixin, FormView):
         context["form"] = self.form_class(instance=self.request.user)
         context["time"] = self.request.user.last_login
 
-        if self.request.user.is_staff:
-            context["order_count"] = Order.objects.all().count()
-            context["order_not_assigned_count"] = Order.objects.filter(employee=None, status=False).count()
-            context["order_done_count"] = Order.objects.filter(status=True).count()
-            context["order_in_progress_count"] = context["order_count"] - context["order_done_count"] - context[
-                "order_not_assigned_count"]
-        else:
-            context["order_count"] = Order.objects.get_orders_count_for_employee(self.request.user)
-            context["order_done_count"] = Order.objects.get_orders_done_count_for_employee(self.request.user)
-            context["order_in_progress_count"] = context["order_count"] - context["order_done_count"]
+        stats = OrderCounter.objects.stats(None if self.request.user.is_staff else self.request.user)
+        context["order_count"] = stats["total"]
+        context["order_not_assigned_count"] = stats["not_assigned"]
+        context["order_in_progress_count"] = stats["in_progress"]
+        context["order_done_count"] = stats["done"]
         return context
 
     def post(self, request, *args, **kwargs):
@@ -78,28 +80,41 @@ class ProfileEditView(LoginRequiredMixin, FormView):
         return super().form_invalid(form)
 
 
-class UsersSearchView(UserPassesTestMixin, View):
+class UsersSearchView(AsyncUserPassesTestMixin, View):
     template_name = "users/userlist.html"
 
     def test_func(self):
         return self.request.user.is_superuser or self.request.user.is_staff
 
-    def get(self, request, search):
-        users = User.objects.filter(Q(email__icontains=search) | Q(
-            first_name__icontains=search.lower().capitalize()) | Q(last_name__icontains=search.lower().capitalize()))
-        context = {"user_list": users, "search": search}
+    async def get(self, request, search):
+        paginator = Paginator(user_search.search(search, User.objects.for_list()), SEARCH_PAGE_SIZE)
+        page = await aget_page(paginator, request.GET.get("page"))
+        context = {"user_list": page, "page": page, "search": search}
         return render(request, self.template_name, context)
 
 
-class UsersListView(UserPassesTestMixin, View):
+class UsersListView(AsyncUserPassesTestMixin, View):
     template_name = "users/userlist.html"
+    roles = {"courier": "Курьеры", "admin": "Администраторы"}
 
     def test_func(self):
         return self.request.user.is_superuser or self.request.user.is_staff
 
-    def get(self, request, *args, **kwargs):
-        users = User.objects.all()
-        context = {"user_list": users, "search": ""}
+    async def get(self, request, *args, **kwargs):
+        role = request.GET.get("role")
+        if role not in self.roles:
+            role = None
+
+        paginator = Paginator(User.objects.for_list(role), USERS_PAGE_SIZE)
+        page = await aget_page(paginator, request.GET.get("page"))
+        context = {
+            "user_list": page,
+            "page": page,
+            "search": "",
+            "role": role,
+            "roles": self.roles.items(),
+            "params": f"{urlencode({'role': role})}&" if role else "",
+        }
         return render(request, self.template_name, context)
 
 